@@ -0,0 +1,2 @@
+# Shared code for the equidistant area maps
+# The league scripts and notebooks import from here so every league runs the same way
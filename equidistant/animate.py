@@ -0,0 +1,232 @@
+# Put yearly maps together into an animation, one frame at a time
+# Frames come in year order, usually from a generator, and share one palette built from
+# the league's team colors. After the first frame, only the box of pixels that changed
+# is stored, with unchanged pixels inside it left transparent. A frame identical to the
+# last one just shows the last one longer, so only about two frames are held at once
+# APNG and animated WebP go through PIL instead, which needs every distinct frame at once
+# Frames can come straight from the map drawing, so no PNG files are needed in between
+
+import glob
+import os
+import re
+import struct
+
+import numpy as np
+from PIL import Image, GifImagePlugin
+
+from equidistant.raster import hex_to_rgb, to_image
+
+
+def year_of(path):
+    """First number in a file name, like 1920 in '1920 NFL cities full map.png'"""
+    found = re.search(r'\d+', os.path.basename(path))
+    return int(found.group()) if found else np.inf
+
+
+def match_palette(image, palette):
+    """
+    (height, width) palette indices of a PIL image not drawn in the palette
+    Fully transparent pixels are the background. The rest go to the palette color
+    nearest their own RGB, before any blending with what is behind them, so a team's
+    faint scatter plot dots still come out as that team
+    """
+    rgba = np.asarray(image.convert('RGBA'))
+    packed = rgba[..., :3].astype(np.uint32) @ np.array([1 << 16, 1 << 8, 1], dtype = np.uint32)
+    colors, inverse = np.unique(packed, return_inverse = True)
+    targets = np.array([hex_to_rgb(i) for i in palette], dtype = np.int32)
+    rgb = np.column_stack([colors >> 16, colors >> 8 & 0xFF, colors & 0xFF]).astype(np.int32)
+    nearest = np.empty(len(colors), dtype = np.uint8)
+    for start in range(0, len(colors), 4096): # (colors, palette) distances a block at a time
+        block = rgb[start : start + 4096]
+        nearest[start : start + 4096] = (((block[:, np.newaxis] - targets)**2).sum(axis = 2)).argmin(axis = 1)
+    grid = nearest[inverse.reshape(packed.shape)]
+    grid[rgba[..., 3] == 0] = 0 # background
+    return grid
+
+
+def frames_from_folder(folder, palette, pattern = '*.png'):
+    """
+    Yield maps saved in a folder as arrays of palette indices, in year order
+    pattern picks the frames out of other images saved there, like '* NFL cities full map.png'
+    Files are opened one at a time. Images not already drawn in the palette are matched to it
+    """
+    paths = sorted(glob.glob(os.path.join(folder, pattern)), key = lambda p: (year_of(p), p))
+    entries = [c for color in palette for c in hex_to_rgb(color)]
+    for path in paths:
+        with Image.open(path) as image:
+            if image.mode == 'P' and image.getpalette()[: len(entries)] == entries:
+                yield np.asarray(image)
+            else:
+                yield match_palette(image, palette)
+
+
+class GifWriter:
+    """
+    Write a GIF a frame at a time with write(grid), where grid is a (height, width)
+    array of palette indices, then close()
+    """
+
+    def __init__(self, path, palette, duration = 588, loop = 0):
+        if len(palette) > 255:
+            raise ValueError('GIF needs one spare palette entry for unchanged pixels')
+        self.path = path
+        self.palette = palette
+        self.keep = len(palette) # transparent, for pixels unchanged from the last frame
+        self.duration = duration
+        self.loop = loop
+        self.file = None
+        self.last = None # full last frame
+        self.pending = None # [image, offset, duration] not written yet, in case the next frame is the same
+
+    def _header(self, width, height):
+        rgb = [c for color in self.palette for c in hex_to_rgb(color)]
+        rgb += [0] * (768 - len(rgb))
+        return (
+            b'GIF89a'
+            + struct.pack('<HH', width, height)
+            + bytes([0xF7, 0, 0]) # 256 color global palette, background index 0
+            + bytes(rgb)
+            # Netscape extension for looping
+            + b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\x00'
+        )
+
+    def _flush(self):
+        if self.pending is None:
+            return
+        image, offset, duration = self.pending
+        for data in GifImagePlugin.getdata(
+            image
+            , offset = offset
+            , duration = duration
+            , disposal = 1 # leave this frame in place for the next one to draw over
+            , transparency = self.keep
+        ):
+            self.file.write(data)
+        self.pending = None
+
+    def write(self, grid, duration = None):
+        """Add a frame, shown for duration milliseconds"""
+        grid = np.asarray(grid, dtype = np.uint8)
+        duration = self.duration if duration is None else duration
+
+        if self.last is None:
+            self.file = open(self.path, 'wb')
+            self.file.write(self._header(grid.shape[1], grid.shape[0]))
+            self.pending = [Image.fromarray(grid, mode = 'P'), (0, 0), duration]
+            self.last = grid
+            return
+
+        changed = grid != self.last
+        if not changed.any():
+            self.pending[2] += duration
+            return
+
+        rows = np.flatnonzero(changed.any(axis = 1))
+        cols = np.flatnonzero(changed.any(axis = 0))
+        box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        delta = np.where(changed[box], grid[box], self.keep).astype(np.uint8)
+
+        self._flush()
+        self.pending = [Image.fromarray(delta, mode = 'P'), (int(cols[0]), int(rows[0])), duration]
+        self.last = grid
+
+    def close(self):
+        if self.file is None:
+            return
+        self._flush()
+        self.file.write(b';')
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_gif(path, frames, palette, duration = 588, loop = 0):
+    """Write an iterable of palette index arrays, in order, as a GIF"""
+    with GifWriter(path, palette, duration = duration, loop = loop) as gif:
+        for grid in frames:
+            gif.write(grid)
+
+
+class PillowWriter:
+    """
+    Write an APNG or animated WebP a frame at a time, like GifWriter
+    PIL encodes them all in close(), so frames are kept until then
+    Team colors get alpha for transparency, as in raster.to_image
+    """
+
+    def __init__(self, path, palette, duration = 588, loop = 0, alpha = 1., format = 'PNG'):
+        self.path = path
+        self.palette = palette
+        self.duration = duration
+        self.loop = loop
+        self.alpha = alpha
+        self.format = format
+        self.frames = [] # [image, duration]
+        self.last = None
+
+    def write(self, grid, duration = None):
+        """Add a frame, shown for duration milliseconds"""
+        grid = np.asarray(grid, dtype = np.uint8)
+        duration = self.duration if duration is None else duration
+        if self.last is not None and np.array_equal(grid, self.last):
+            self.frames[-1][1] += duration
+            return
+        self.frames.append([to_image(grid, self.palette, self.alpha), duration])
+        self.last = grid
+
+    def close(self):
+        if not self.frames:
+            return
+        images = [i[0] for i in self.frames]
+        options = {'lossless' : True} if self.format == 'WEBP' else {}
+        images[0].save(
+            self.path
+            , format = self.format
+            , save_all = True
+            , append_images = images[1:]
+            , duration = [i[1] for i in self.frames]
+            , loop = self.loop
+            , **options
+        )
+        self.frames = []
+        self.last = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# PIL format for each animation file extension
+formats = {
+    '.gif' : 'GIF'
+    , '.png' : 'PNG'
+    , '.apng' : 'PNG'
+    , '.webp' : 'WEBP'
+}
+
+
+def open_animation(path, palette, duration = 588, loop = 0, alpha = 1.):
+    """
+    Writer for an animation, picked by the extension of path: .gif, .png or .apng, or .webp
+    GIF has no partial transparency, so alpha only applies to the others
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in formats:
+        raise ValueError('Unknown animation format: {}'.format(path))
+    if formats[extension] == 'GIF':
+        return GifWriter(path, palette, duration = duration, loop = loop)
+    return PillowWriter(path, palette, duration = duration, loop = loop, alpha = alpha, format = formats[extension])
+
+
+def write_animation(path, frames, palette, duration = 588, loop = 0, alpha = 1.):
+    """Write an iterable of palette index arrays, in order, as a GIF, APNG or WebP"""
+    with open_animation(path, palette, duration = duration, loop = loop, alpha = alpha) as out:
+        for grid in frames:
+            out.write(grid)
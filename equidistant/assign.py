@@ -0,0 +1,61 @@
+# Find the closest home stadium for every geographic point
+# Points and stadiums are (N, 2) and (M, 2) arrays of decimal [latitude, longitude],
+# the same column order as df_points[['latitude', 'longitude']]
+# Work is done a chunk of points at a time with the kernels in equidistant.distance,
+# so the (chunk, M) distance matrix stays small no matter how many points there are
+# Pass a PointSet instead of an array to keep the points' trig between calls
+
+import numpy as np
+
+from equidistant.distance import as_points, get_metric
+
+
+# Points per chunk. 65k points x 40 stadiums x 8 bytes is about 20MB per distance matrix
+chunk_size = 2**16
+
+
+def stadium_coords(stadia):
+    """(M, 2) array of [latitude, longitude] from parsed stadium rows"""
+    return np.array([[i[1], i[2]] for i in stadia], dtype = float).reshape(-1, 2)
+
+
+def nearest_stadium(points, stadiums, metric = 'pythagorean', return_distance = False
+                    , use_index = False):
+    """
+    Index of the closest stadium for every point
+    Inputs are (N, 2) points, as an array or PointSet, and (M, 2) stadiums in decimal,
+    and a key of metrics: pythagorean, equirectangular or haversine
+    Output is an (N,) integer array indexing into stadiums, plus the (N,) distance
+    to that stadium if return_distance. Ties go to the first stadium listed
+    use_index answers haversine with a KD-tree instead of checking every stadium
+    """
+    points = as_points(points)
+    stadiums = np.asarray(stadiums, dtype = float).reshape(-1, 2)
+    if len(stadiums) == 0:
+        raise ValueError('No stadiums to measure distance to')
+    kernel = get_metric(metric)
+    if use_index:
+        if metric != 'haversine':
+            raise ValueError('The spatial index only answers haversine distance')
+        from equidistant.spatial import SphereIndex # only needs scipy when asked for
+        return SphereIndex(stadiums).query(points, return_distance = return_distance)
+
+    # Cached over all points first, so every chunk is a view of the same arrays
+    points.prepare(kernel.fields)
+    stadiums = as_points(stadiums).prepare(kernel.fields)
+
+    closest = np.empty(len(points), dtype = np.intp)
+    min_rank = np.empty(len(points))
+    for start in range(0, len(points), chunk_size):
+        stop = start + chunk_size
+        rank = kernel.rank(points[start : stop], stadiums)
+        closest[start : stop] = rank.argmin(axis = 1)
+        min_rank[start : stop] = np.take_along_axis(
+            rank
+            , closest[start : stop, np.newaxis]
+            , axis = 1
+        )[:, 0]
+
+    if return_distance:
+        return closest, kernel.to_distance(min_rank)
+    return closest
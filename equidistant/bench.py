@@ -0,0 +1,220 @@
+# How long each stage of the maps takes, on synthetic points, for each league
+# Points are drawn evenly inside BBox from a fixed seed, so runs are repeatable and
+# need no US.txt. Each league's real stadium history is mapped epoch by epoch:
+#   load     stadium table, teams and epochs from the registry
+#   points   drawing the points, and their trig for the metric
+#   assign   closest stadium of every point
+#   stripe   shared stadiums and stripe rules
+#   render   points and stadium dots onto the map grid
+#   encode   each map as a PNG in memory
+#   animate  each map into a GIF, a frame per year
+# Each league and point count runs in its own process, so its peak RSS is its own
+# Results are saved as JSON. --compare prints how each stage changed against an older file
+#
+#   python -m equidistant.bench --points 10000 100000 1000000 2000000 -o bench.json
+#   python -m equidistant.bench --leagues NFL --points 100000 --compare bench.json
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from equidistant.animate import GifWriter
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.distance import PointSet, get_metric
+from equidistant.incremental import IncrementalAssigner
+from equidistant.leagues import leagues, year_range
+from equidistant.profiling import peak_rss
+from equidistant.raster import BBox, size, team_palette, apply_stripes, row_index, splat, draw_stadiums, to_image
+from equidistant.registry import league_teams, load_league
+from equidistant.stripes import split_shared
+from equidistant.timeline import epochs
+
+
+point_counts = [10**4, 10**5, 10**6, 2 * 10**6]
+
+stages = ['load', 'points', 'assign', 'stripe', 'render', 'encode', 'animate']
+
+
+def synthetic_points(n, bbox = BBox, seed = 0):
+    """(n, 2) [latitude, longitude] drawn evenly inside bbox"""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(bbox[2], bbox[3], n)
+        , rng.uniform(bbox[0], bbox[1], n)
+    ])
+
+
+def run_case(league, n_points, first_year = None, last_year = None, incremental = False, seed = 0):
+    """
+    Time every stage of mapping one league on n_points synthetic points
+    incremental assigns with IncrementalAssigner, carrying owners year to year, instead
+    of finding the closest stadium from scratch each epoch
+    """
+    times = dict.fromkeys(stages, 0.)
+    clock = time.perf_counter()
+    stadia, stripes = load_league(league)
+    metric = leagues[league]['metric']
+    default_first, default_last = year_range(league, stadia)
+    first_year = default_first if first_year is None else first_year
+    last_year = default_last if last_year is None else last_year
+    palette, lookup, index, teams = team_palette(stadia, league_teams(league))
+    timeline = [i for i in epochs(stadia, stripes, first_year, last_year) if len(i.rows)]
+    times['load'] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    points = synthetic_points(n_points, seed = seed)
+    point_set = PointSet(points).prepare(get_metric(metric).fields)
+    times['points'] = time.perf_counter() - clock
+    assigner = IncrementalAssigner(point_set, stadia, metric) if incremental else None
+
+    per_epoch = []
+    folder = tempfile.TemporaryDirectory()
+    gif = GifWriter(os.path.join(folder.name, 'bench.gif'), palette)
+    for epoch in timeline:
+        rows = [stadia[i] for i in epoch.rows]
+        took = {}
+
+        clock = time.perf_counter()
+        if incremental:
+            assigner.update(epoch.rows)
+            closest = assigner.labels
+        else:
+            closest = nearest_stadium(point_set, stadium_coords(rows), metric = metric)
+        took['assign'] = time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        if incremental:
+            values = index[split_shared(closest, points, stadia, epoch.rows)]
+        else:
+            values = index[epoch.rows][split_shared(closest, points, rows)]
+        rules_lookup = row_index(rows, lookup, index[epoch.rows])[1]
+        values = apply_stripes(values, points, epoch.stripes, rules_lookup)
+        took['stripe'] = time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        grid = draw_stadiums(splat(points, values), stadium_coords(rows))
+        took['render'] = time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        to_image(grid, palette, 0.6).save(io.BytesIO(), format = 'PNG')
+        took['encode'] = time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        for yr in range(epoch.start, epoch.end + 1):
+            gif.write(grid)
+        took['animate'] = time.perf_counter() - clock
+
+        for stage, seconds in took.items():
+            times[stage] += seconds
+        per_epoch.append(dict(start = epoch.start, end = epoch.end, stadiums = len(rows), **took))
+
+    clock = time.perf_counter()
+    gif.close()
+    times['animate'] += time.perf_counter() - clock
+    folder.cleanup()
+
+    return {
+        'league' : league
+        , 'points' : n_points
+        , 'metric' : metric
+        , 'assign' : 'incremental' if incremental else 'full'
+        , 'first_year' : first_year
+        , 'last_year' : last_year
+        , 'epochs' : len(timeline)
+        , 'seconds' : times
+        , 'total' : sum(times.values())
+        , 'points_per_second' : n_points * len(timeline) / max(times['assign'] + times['stripe'], 1e-9)
+        , 'peak_rss_mb' : peak_rss()
+        , 'per_epoch' : per_epoch
+    }
+
+
+def environment():
+    """What the numbers were measured on"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD']
+            , capture_output = True, text = True, cwd = os.path.dirname(__file__)
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit' : commit
+        , 'python' : platform.python_version()
+        , 'numpy' : np.__version__
+        , 'platform' : platform.platform()
+        , 'processor' : platform.processor()
+        , 'cpus' : os.cpu_count()
+        , 'map_size' : list(size)
+        , 'time' : time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def run(league_names = None, counts = point_counts, first_year = None, last_year = None
+        , incremental = False, seed = 0, progress = print):
+    """Results of run_case for every league and point count, each in a fresh process"""
+    results = {'environment' : environment(), 'cases' : []}
+    for league in league_names or list(leagues):
+        for n in counts:
+            with ProcessPoolExecutor(max_workers = 1) as pool:
+                case = pool.submit(run_case, league, n, first_year, last_year, incremental, seed).result()
+            results['cases'].append(case)
+            if progress is not None:
+                progress(summary(case))
+    return results
+
+
+def summary(case):
+    """One line of a case's stage times"""
+    stage_times = '  '.join('{} {:.2f}s'.format(i, case['seconds'][i]) for i in stages)
+    memory = '' if case['peak_rss_mb'] is None else '  peak {:.0f}MB'.format(case['peak_rss_mb'])
+    return '{} {:>9,} points {:>3} epochs  {}  total {:.2f}s{}'.format(
+        case['league'], case['points'], case['epochs'], stage_times, case['total'], memory
+    )
+
+
+def compare(old, new):
+    """Lines of new time / old time per stage for the cases in both results"""
+    key = lambda i: (i['league'], i['points'], i['assign'], i['first_year'], i['last_year'])
+    before = {key(i) : i for i in old['cases']}
+    lines = []
+    for case in new['cases']:
+        if key(case) not in before:
+            continue
+        then = before[key(case)]
+        ratios = [
+            '{} {:.2f}x'.format(i, case['seconds'][i] / then['seconds'][i])
+            for i in stages if then['seconds'][i] > 0
+        ]
+        lines.append('{} {:>9,} points  {}  total {:.2f}x'.format(
+            case['league'], case['points'], '  '.join(ratios), case['total'] / then['total']
+        ))
+    return lines
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Time each stage of the maps on synthetic points')
+    parser.add_argument('--leagues', nargs = '+', choices = list(leagues), help = 'by default all of them')
+    parser.add_argument('--points', type = int, nargs = '+', default = point_counts)
+    parser.add_argument('--first-year', type = int)
+    parser.add_argument('--last-year', type = int)
+    parser.add_argument('--incremental', action = 'store_true', help = 'carry owners year to year')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('-o', '--output', default = 'bench.json')
+    parser.add_argument('--compare', help = 'earlier results to compare against')
+    args = parser.parse_args()
+
+    results = run(args.leagues, args.points, args.first_year, args.last_year, args.incremental, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent = 1)
+    if args.compare:
+        with open(args.compare) as f:
+            print('\n'.join(compare(json.load(f), results)))
@@ -0,0 +1,127 @@
+# Results kept on disk between runs, under a hash of everything they came from
+# A year's map only depends on the stadiums active that year (coordinates and color),
+# the stripe rules in effect, the distance metric, the points and how it is drawn.
+# Names and years don't change it, so fixing one stadium only recomputes the years
+# it is active, and years with the same inputs share one entry
+# The folder is kept under max_bytes by deleting the least recently used entries
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+cache_dir = os.path.join('US_Coords', 'cache')
+
+max_bytes = 4 * 2**30
+
+
+def points_version(points):
+    """Short hash of a point set's values, so samples and edits get their own entries"""
+    points = np.ascontiguousarray(points)
+    digest = hashlib.sha256(str((points.shape, points.dtype.str)).encode())
+    digest.update(points.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def result_key(rows, stripes, metric, points, **settings):
+    """
+    sha256 of the inputs to one map
+    rows are the active stadium rows in listed order, stripes the active stripe rules,
+    points a points_version, and settings anything else the result depends on, like
+    the palette index of each row or the image size
+    """
+    inputs = [
+        [[float(i[1]), float(i[2]), i[3]] for i in rows]
+        , [[i[2], i[3]] for i in stripes]
+        , metric
+        , points
+        , settings
+    ]
+    return hashlib.sha256(json.dumps(inputs, sort_keys = True, default = str).encode()).hexdigest()
+
+
+def epoch_key(stadia, epoch, lookup, metric, points, index = None, **settings):
+    """
+    result_key of an epoch's map, which also depends on each row's palette index,
+    index if given or else by color from lookup
+    """
+    rows = [stadia[i] for i in epoch.rows]
+    if index is None:
+        colors = [lookup[i[3]] for i in rows]
+    else:
+        colors = [int(index[i]) for i in epoch.rows]
+    return result_key(rows, epoch.stripes, metric, points, index = colors, **settings)
+
+
+class ResultCache:
+    """
+    Arrays by result_key, as .npy files in directory
+    A file's modified time is when it was last used, which eviction goes by
+    """
+
+    def __init__(self, directory = cache_dir, max_bytes = max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.directory, key[: 2], key + '.npy')
+
+    def get(self, key):
+        """Array saved under key, or None"""
+        path = self.path(key)
+        try:
+            array = np.load(path)
+        except (FileNotFoundError, ValueError, EOFError): # missing, or cut off mid write
+            return None
+        os.utime(path)
+        return array
+
+    def put(self, key, array):
+        """Save array under key, then trim the cache to max_bytes"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp, 'wb') as f:
+            np.save(f, np.asarray(array))
+        os.replace(temp, path) # readers never see half a file
+        self.evict()
+
+    def fetch(self, key, compute):
+        """Saved array for key, or compute() saved under it"""
+        array = self.get(key)
+        if array is None:
+            array = compute()
+            self.put(key, array)
+        return array
+
+    def entries(self):
+        """(last used, bytes, path) of every entry, oldest first"""
+        found = []
+        for folder, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.npy'):
+                    stat = os.stat(os.path.join(folder, name))
+                    found.append((stat.st_mtime, stat.st_size, os.path.join(folder, name)))
+        return sorted(found)
+
+    def size(self):
+        return sum(i[1] for i in self.entries())
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(i[1] for i in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass # another process got it first
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
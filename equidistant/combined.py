@@ -0,0 +1,269 @@
+# Every league at once: the closest team of each league, and of any league, in one pass
+# All leagues' stadium rows go into one list tagged by league, and each chunk of points
+# is measured against all of that year's stadiums together, once per metric. The
+# closest of each league's columns gives that league's map, the same as its own run,
+# and the closest of all of them, by combined_metric, the closest pro team of any sport
+# Points are loaded and their trig worked out once for every league
+# Each league's labels use its own palette. The combined labels use one palette of every
+# league's entries, offset per league, which can pass 256 entries, so they are uint16
+#
+#   python -m equidistant.combined -o "All leagues" --first-year 1920 --last-year 2021 --maps
+
+import argparse
+import os
+
+import numpy as np
+
+from equidistant.assign import chunk_size, stadium_coords
+from equidistant.distance import as_points, get_metric
+from equidistant.geonames import load_points
+from equidistant.history import create_history, write_epoch, History
+from equidistant.leagues import leagues, year_range
+from equidistant.raster import team_palette, apply_stripes, row_index, splat, draw_stadiums, to_image
+from equidistant.registry import league_teams, load_league
+from equidistant.stripes import split_shared
+from equidistant.timeline import epochs
+
+
+# Distance for the closest team of any league. Great circle, since the leagues' own
+# metrics differ
+combined_metric = 'haversine'
+
+# Difference in rank that still counts as a tie between leagues. Rounding in a rank like
+# haversine's (1 - cos) / 2 is absolute, about 1e-16, and far smaller than 1e-14
+tie_tolerance = 1e-14
+
+
+def nearest_by_league(points, stadiums, tags, metrics, combined_metric = combined_metric, measure = None):
+    """
+    Closest stadium of each league for every point, in one pass over the points
+    stadiums are (M, 2) [latitude, longitude] listed league by league, tagged with (M,)
+    league numbers, and metrics is the metric of each league number. measure is the
+    league numbers to measure, by default all
+    Returns three (N, leagues) arrays: each league's closest stadium by its own metric,
+    its closest by combined_metric and that one's combined_metric rank, which
+    closest_of_all takes the closest of any league from. Leagues not measured or without
+    stadiums get -1, -1 and inf. Ties go to the first stadium listed, like nearest_stadium
+    """
+    points = as_points(points)
+    stadiums = as_points(np.asarray(stadiums, dtype = float).reshape(-1, 2))
+    tags = np.asarray(tags)
+    if (np.diff(tags) < 0).any():
+        raise ValueError('Stadiums need to be listed league by league')
+    measure = range(len(metrics)) if measure is None else measure
+
+    # Each league's stadiums are a run of columns
+    bounds = np.searchsorted(tags, np.arange(len(metrics) + 1))
+    measure = [n for n in measure if bounds[n] < bounds[n + 1]]
+    kernels = {metric : get_metric(metric) for metric in set(metrics) | {combined_metric}}
+    for kernel in kernels.values():
+        points.prepare(kernel.fields)
+        stadiums.prepare(kernel.fields)
+
+    by_league = np.full((len(points), len(metrics)), -1, dtype = np.intp)
+    nearest = np.full((len(points), len(metrics)), -1, dtype = np.intp)
+    rank = np.full((len(points), len(metrics)), np.inf)
+    for start in range(0, len(points), chunk_size):
+        stop = start + chunk_size
+        chunk = points[start : stop]
+        for n in measure:
+            first, last = bounds[n], bounds[n + 1]
+            league_stadiums = stadiums[first : last]
+            combined_rank = kernels[combined_metric].rank(chunk, league_stadiums)
+            column = combined_rank.argmin(axis = 1)
+            nearest[start : stop, n] = first + column
+            rank[start : stop, n] = np.take_along_axis(combined_rank, column[:, np.newaxis], axis = 1)[:, 0]
+            if metrics[n] == combined_metric:
+                by_league[start : stop, n] = first + column
+            else:
+                by_league[start : stop, n] = first + kernels[metrics[n]].rank(chunk, league_stadiums).argmin(axis = 1)
+    return by_league, nearest, rank
+
+
+def closest_of_all(nearest, rank):
+    """
+    Closest stadium of any league from nearest_by_league's nearest and rank
+    The first league wins ties. Each league is measured on its own, so a stadium two
+    leagues share can come out a rounding error apart, which still counts as a tie
+    """
+    best = rank.min(axis = 1, keepdims = True)
+    tied = rank <= best + tie_tolerance
+    return nearest[np.arange(len(nearest)), tied.argmax(axis = 1)]
+
+
+class AllLeagues:
+    """
+    Every league's stadium rows in one list, stadia, with each row's league number in tags
+    Stripe rules carry their league number as a fifth item
+    """
+
+    def __init__(self, league_names = None):
+        self.leagues = list(league_names or leagues)
+        self.metrics = [leagues[i]['metric'] for i in self.leagues]
+        self.stadia = []
+        self.stripes = []
+        tags = []
+        self.palettes = {} # league: (palette, lookup, index of each of its rows, teams)
+        self.palette = ['#ffffff', '#000000'] # combined, like raster.team_palette's
+        self.teams = [None, None]
+        self.offsets = {} # league: combined index of its palette index 0
+        years = []
+        for n, league in enumerate(self.leagues):
+            stadia, stripes = load_league(league)
+            palette, lookup, index, teams = team_palette(stadia, league_teams(league))
+            self.palettes[league] = (palette, lookup, index, teams)
+            self.offsets[league] = len(self.palette) - 2
+            self.palette += palette[2 :]
+            self.teams += ['{} {}'.format(league, i) for i in teams[2 :]]
+            self.stadia += [i[: 6] for i in stadia]
+            self.stripes += [i[: 4] + [n] for i in stripes]
+            tags += [n] * len(stadia)
+            years.append(year_range(league, stadia))
+        self.tags = np.array(tags, dtype = np.intp)
+        self.first_year = min(i[0] for i in years)
+        self.last_year = max(i[1] for i in years)
+        # League palette index of each row, and its combined one
+        self.index = np.concatenate([self.palettes[i][2] for i in self.leagues])
+        offsets = np.array([self.offsets[i] for i in self.leagues])
+        self.combined_index = (self.index + offsets[self.tags]).astype(np.uint16)
+        self._points = None
+        self._kept = {} # league number: [key, labels, closest row by combined_metric, its rank]
+
+    def epoch_labels(self, points, epoch, combined_metric = combined_metric):
+        """
+        Palette index of each league's closest team for every point in an epoch,
+        {league: (N,) uint8, or None for leagues without home games}, and the uint16
+        combined index of the closest team of any league
+        Leagues whose stadiums and stripes are the same as in the last epoch asked for,
+        for the same points, are not measured again
+        """
+        rows = np.asarray(epoch.rows)
+        tags = self.tags[rows]
+        if points is not self._points:
+            self._points = points
+            self._kept = {}
+        keys = [
+            (tuple(rows[tags == n]), tuple(tuple(i) for i in epoch.stripes if i[4] == n))
+            for n in range(len(self.leagues))
+        ]
+        measure = [n for n in range(len(self.leagues)) if (n in tags) and self._kept.get(n, [None])[0] != keys[n]]
+        if measure:
+            by_league, nearest, rank = nearest_by_league(
+                points, stadium_coords([self.stadia[i] for i in rows]), tags, self.metrics, combined_metric, measure
+            )
+
+        labels = {}
+        for n, league in enumerate(self.leagues):
+            mine = np.flatnonzero(tags == n)
+            if len(mine) == 0:
+                labels[league] = None
+                self._kept.pop(n, None)
+                continue
+            if n in measure:
+                league_rows = [self.stadia[i] for i in rows[mine]]
+                # Position among the league's own rows, as if it was measured alone
+                local = by_league[:, n] - mine[0]
+                colors, lookup = row_index(league_rows, self.palettes[league][1], self.index[rows[mine]])
+                values = apply_stripes(colors[split_shared(local, points, league_rows)], points, list(keys[n][1]), lookup)
+                # Closest by combined_metric as a row of stadia, which stays put when other leagues change
+                self._kept[n] = [keys[n], values, rows[nearest[:, n]], rank[:, n].copy()]
+            labels[league] = self._kept[n][1]
+
+        kept = sorted(self._kept)
+        closest = closest_of_all(
+            np.column_stack([self._kept[n][2] for n in kept])
+            , np.column_stack([self._kept[n][3] for n in kept])
+        )
+        combined = self.combined_index[split_shared(closest, points, self.stadia, rows)]
+        for n in kept:
+            rules = list(self._kept[n][0][1])
+            if rules:
+                mine = rows[tags == n]
+                lookup = row_index([self.stadia[i] for i in mine], self.palettes[self.leagues[n]][1], self.index[mine])[1]
+                offset = self.offsets[self.leagues[n]]
+                lookup = {color : [offset + i for i in np.atleast_1d(v)] for color, v in lookup.items()}
+                combined = apply_stripes(combined, points, rules, lookup)
+        return labels, combined
+
+    def timeline(self, first_year = None, last_year = None):
+        """Epochs of every league together: a new one whenever any league changes"""
+        first_year = self.first_year if first_year is None else first_year
+        last_year = self.last_year if last_year is None else last_year
+        return epochs(self.stadia, self.stripes, first_year, last_year)
+
+    def frame(self, points, combined, rows):
+        """
+        Map of combined indices as a (height, width) uint8 grid with stadium dots, and its palette
+        Every league's colors don't fit in one 8-bit palette, but a year's teams do, so
+        each map gets a palette of only the entries it uses
+        """
+        used = np.union1d([0, 1], combined) # background and marker stay at 0 and 1
+        if len(used) > 256:
+            raise ValueError('Too many teams for an 8-bit map: {}'.format(len(used)))
+        grid = splat(points, np.searchsorted(used, combined).astype(np.uint8))
+        draw_stadiums(grid, stadium_coords([self.stadia[i] for i in rows]))
+        return grid, [self.palette[i] for i in used]
+
+
+def build_all(directory, points = None, first_year = None, last_year = None, league_names = None
+              , maps = False, alpha = 0.6):
+    """
+    Closest team of every league, and of any league, for every point in every year,
+    saved as a History per league in <directory>/<league> and the combined one in
+    <directory>/All. maps also draws the combined map of each year in <directory>/maps
+    """
+    all_leagues = AllLeagues(league_names)
+    first_year = all_leagues.first_year if first_year is None else first_year
+    last_year = all_leagues.last_year if last_year is None else last_year
+    if points is None:
+        points = load_points()[0]
+    points = as_points(np.asarray(points, dtype = float))
+
+    histories = {
+        league : create_history(
+            os.path.join(directory, league), league, points.coords, all_leagues.palettes[league][0]
+            , first_year, last_year, leagues[league]['metric'], all_leagues.palettes[league][3]
+        )
+        for league in all_leagues.leagues
+    }
+    combined_history = create_history(
+        os.path.join(directory, 'All'), 'All', points.coords, all_leagues.palette
+        , first_year, last_year, combined_metric, all_leagues.teams
+    )
+    if maps:
+        os.makedirs(os.path.join(directory, 'maps'), exist_ok = True)
+
+    for epoch in all_leagues.timeline(first_year, last_year):
+        if len(epoch.rows) == 0:
+            continue # stays at no team
+        labels, combined = all_leagues.epoch_labels(points, epoch)
+        for league, values in labels.items():
+            if values is not None:
+                write_epoch(histories[league], epoch, values)
+        write_epoch(combined_history, epoch, combined)
+        if maps:
+            image = to_image(*all_leagues.frame(points.coords, combined, epoch.rows), alpha)
+            for yr in range(epoch.start, epoch.end + 1):
+                image.save(os.path.join(directory, 'maps', '{} closest team.png'.format(yr)))
+
+    for history in list(histories.values()) + [combined_history]:
+        history.owners.flush()
+    return History(os.path.join(directory, 'All'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Closest team of every league, and of any league, in one pass')
+    parser.add_argument('-o', '--output', default = 'All leagues')
+    parser.add_argument('--leagues', nargs = '+', choices = list(leagues), help = 'by default all of them')
+    parser.add_argument('--first-year', type = int)
+    parser.add_argument('--last-year', type = int)
+    parser.add_argument('--maps', action = 'store_true', help = 'also draw the combined map of each year')
+    args = parser.parse_args()
+
+    build_all(
+        args.output
+        , first_year = args.first_year
+        , last_year = args.last_year
+        , league_names = args.leagues
+        , maps = args.maps
+    )
@@ -0,0 +1,139 @@
+# Distance from points to stadiums, a whole array at a time
+# The GeoNames points never change, so their radians, sines and cosines are worked out
+# once in a PointSet and kept for every stadium, year and league. After that:
+#   pythagorean: flat lat/lon, in degrees
+#   equirectangular: flat, with longitude shrunk by cos(latitude) between the two, in miles
+#   haversine: great circle miles, from the dot product of unit vectors
+# Each metric ranks with something cheaper that sorts the same way as the distance
+# (squared, or 1 - cos), so finding the closest stadium never needs a square root
+# or arcsine per pair, only for the winners
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# Distance units wash out in final product but nice for troubleshooting
+earth_radius = 3956 # miles (or 6371km)
+
+
+# How to work out each cached value from a PointSet
+_fields = {
+    'lat' : lambda p: np.asarray(p.coords[:, 0], dtype = float)
+    , 'lon' : lambda p: np.asarray(p.coords[:, 1], dtype = float)
+    , 'lat_rad' : lambda p: np.radians(p.field('lat'))
+    , 'lon_rad' : lambda p: np.radians(p.field('lon'))
+    , 'sin_lat' : lambda p: np.sin(p.field('lat_rad'))
+    , 'cos_lat' : lambda p: np.cos(p.field('lat_rad'))
+    , 'sin_half_lat' : lambda p: np.sin(p.field('lat_rad') / 2)
+    , 'cos_half_lat' : lambda p: np.cos(p.field('lat_rad') / 2)
+    , 'xyz' : lambda p: np.column_stack([
+        p.field('cos_lat') * np.cos(p.field('lon_rad'))
+        , p.field('cos_lat') * np.sin(p.field('lon_rad'))
+        , p.field('sin_lat')
+    ])
+}
+
+
+class PointSet:
+    """
+    (N, 2) [latitude, longitude] points with their trig worked out on first use and kept
+    Works in place of the array: rows of it (points[a : b], points[mask]) are PointSets
+    sharing what is already cached, and other indexing (points[:, 0]) reaches the array
+    """
+
+    def __init__(self, points):
+        self.coords = np.asarray(points).reshape(-1, 2) # may be a float32 memory map
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __array__(self, dtype = None, copy = None):
+        return np.asarray(self.coords, dtype = dtype)
+
+    @property
+    def shape(self):
+        return self.coords.shape
+
+    @property
+    def dtype(self):
+        return self.coords.dtype
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            return self.coords[index]
+        rows = PointSet(self.coords[index])
+        rows._cache = {name : values[index] for name, values in self._cache.items()}
+        return rows
+
+    def field(self, name):
+        """A cached value per point, like 'cos_lat' or 'xyz', worked out if needed"""
+        if name not in self._cache:
+            self._cache[name] = _fields[name](self)
+        return self._cache[name]
+
+    def prepare(self, names):
+        """Work out cached values for every point now, so chunks of them share the result"""
+        for name in names:
+            self.field(name)
+        return self
+
+
+def as_points(points):
+    """PointSet of points, or points themselves if they already are one"""
+    return points if isinstance(points, PointSet) else PointSet(points)
+
+
+def _pythagorean(points, stadiums):
+    d_lat = points.field('lat')[:, np.newaxis] - stadiums.field('lat')[np.newaxis, :]
+    d_lon = points.field('lon')[:, np.newaxis] - stadiums.field('lon')[np.newaxis, :]
+    return d_lat**2 + d_lon**2
+
+
+def _equirectangular(points, stadiums):
+    d_lat = points.field('lat_rad')[:, np.newaxis] - stadiums.field('lat_rad')[np.newaxis, :]
+    d_lon = points.field('lon_rad')[:, np.newaxis] - stadiums.field('lon_rad')[np.newaxis, :]
+    # cos of the latitude halfway between, from cached half angles: cos(a + b)
+    cos_mid = (
+        np.outer(points.field('cos_half_lat'), stadiums.field('cos_half_lat'))
+        - np.outer(points.field('sin_half_lat'), stadiums.field('sin_half_lat'))
+    )
+    return (d_lon * cos_mid)**2 + d_lat**2
+
+
+def _haversine(points, stadiums):
+    # haversine of the central angle, (1 - cos) / 2, straight from unit vectors
+    return (1 - points.field('xyz') @ stadiums.field('xyz').T) / 2
+
+
+# fields: cached values a metric needs. rank: (N, M) array sorting like distance
+# to_distance: distance from rank
+Metric = namedtuple('Metric', ['fields', 'rank', 'to_distance'])
+
+metrics = {
+    'pythagorean' : Metric(['lat', 'lon'], _pythagorean, np.sqrt)
+    , 'equirectangular' : Metric(
+        ['lat_rad', 'lon_rad', 'sin_half_lat', 'cos_half_lat']
+        , _equirectangular
+        , lambda rank: earth_radius * np.sqrt(rank)
+    )
+    , 'haversine' : Metric(
+        ['xyz']
+        , _haversine
+        , lambda rank: earth_radius * 2 * np.arcsin(np.sqrt(np.clip(rank, 0, 1)))
+    )
+}
+
+
+def get_metric(metric):
+    """Metric for a name in metrics, raising ValueError for anything else"""
+    if metric not in metrics:
+        raise ValueError('Unknown distance metric: {}'.format(metric))
+    return metrics[metric]
+
+
+def distance(points, stadiums, metric = 'pythagorean'):
+    """(N, M) distance from every point to every stadium, both (N, 2) arrays or PointSets"""
+    kernel = get_metric(metric)
+    return kernel.to_distance(kernel.rank(as_points(points), as_points(stadiums)))
@@ -0,0 +1,134 @@
+# GeoNames points to check closest team, parsed once and memory mapped after that
+# http://download.geonames.org/export/dump/US.zip
+# Reading all of US.txt takes a while and a few GB of RAM, only to keep latitude and
+# longitude. preprocess() keeps those and population, shuffled the same way as
+# sample(frac = 1, random_state = 1) and limited to the BBox, as contiguous .npy files.
+# load_points() maps them read only, so every league run shares one copy in the page cache
+#
+# Run once after downloading a new US.txt:
+#   python -m equidistant.geonames
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from equidistant.raster import BBox
+
+
+source = os.path.join('US_Coords', 'US.txt')
+cache_dir = os.path.join('US_Coords', 'points')
+
+columns = [
+    'geonameid'
+    , 'name'
+    , 'asciiname'
+    , 'alternatenames'
+    , 'latitude'
+    , 'longitude'
+    , 'feature class'
+    , 'feature code'
+    , 'country code'
+    , 'cc2'
+    , 'admin1 code'
+    , 'admin2 code'
+    , 'admin3 code'
+    , 'admin4 code'
+    , 'population'
+    , 'elevation'
+    , 'dem'
+    , 'timezone'
+    , 'modification date'
+]
+
+
+def file_hash(path):
+    """sha256 of a file, read a block at a time"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(2**20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def preprocess(path = source, out_dir = cache_dir, bbox = BBox, random_state = 1):
+    """
+    Write points.npy, population.npy and meta.json for a GeoNames dump
+    points are float32 [latitude, longitude], in the same order as the scripts'
+    us_coords[['latitude', 'longitude']].sample(frac = 1, random_state = 1)
+    """
+    us_coords = pd.read_csv(path
+                            , sep = '\t'
+                            , names = columns
+                            , usecols = ['latitude', 'longitude', 'population']
+                           )
+    # Shuffling only depends on the number of rows, so dropping columns keeps the order
+    us_coords = us_coords.sample(frac = 1, random_state = random_state)
+
+    # Remove points outside the BBox.  Not going to see them anyways
+    us_coords = us_coords[
+        (us_coords['longitude'] >= bbox[0])
+        & (us_coords['longitude'] <= bbox[1])
+        & (us_coords['latitude'] >= bbox[2])
+        & (us_coords['latitude'] <= bbox[3])
+    ]
+
+    os.makedirs(out_dir, exist_ok = True)
+    points = np.ascontiguousarray(us_coords[['latitude', 'longitude']].to_numpy(dtype = np.float32))
+    np.save(os.path.join(out_dir, 'points.npy'), points)
+    np.save(os.path.join(out_dir, 'population.npy')
+            , us_coords['population'].fillna(0).to_numpy(dtype = np.int32))
+
+    meta = {
+        'source' : path
+        , 'source_size' : os.path.getsize(path)
+        , 'source_mtime' : os.path.getmtime(path)
+        , 'bbox' : list(bbox)
+        , 'random_state' : random_state
+        , 'count' : len(points)
+    }
+    # Identifies this point set, so anything computed from it can tell when it changes
+    meta['version'] = hashlib.sha256(
+        (file_hash(path) + json.dumps(meta['bbox']) + str(random_state)).encode()
+    ).hexdigest()[:16]
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent = 1)
+    return meta
+
+
+def load_meta(directory = cache_dir):
+    """meta.json written by preprocess"""
+    with open(os.path.join(directory, 'meta.json')) as f:
+        return json.load(f)
+
+
+def is_stale(directory = cache_dir, path = source):
+    """True if there is no cache yet, or US.txt changed since it was built"""
+    try:
+        meta = load_meta(directory)
+    except FileNotFoundError:
+        return True
+    if not os.path.exists(path):
+        return False # keep using the cache without the source around
+    return (meta['source_size'] != os.path.getsize(path)
+            or meta['source_mtime'] != os.path.getmtime(path))
+
+
+def load_points(directory = cache_dir, path = source, mmap = True):
+    """
+    (N, 2) float32 [latitude, longitude] points and (N,) population
+    Builds the cache from US.txt first if it is missing or out of date
+    Points are shuffled, so points[:n] is a random sample of n
+    """
+    if is_stale(directory, path):
+        preprocess(path, directory)
+    mmap_mode = 'r' if mmap else None
+    points = np.load(os.path.join(directory, 'points.npy'), mmap_mode = mmap_mode)
+    population = np.load(os.path.join(directory, 'population.npy'), mmap_mode = mmap_mode)
+    return points, population
+
+
+if __name__ == '__main__':
+    print(preprocess())
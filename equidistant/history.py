@@ -0,0 +1,204 @@
+# Every year's map for a league, kept on disk as one (years, points) array
+# owners.npy holds the palette index of the team closest to each point in each year,
+# with shared stadiums and stripes applied, so it matches the maps. 0 means no team
+# It is memory-mapped, so change maps and a place's timeline are read from it
+# without finding the closest stadium again
+#
+#   python -m equidistant.history NFL -o "NFL history"
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from equidistant.geonames import load_meta, load_points
+from equidistant.incremental import IncrementalAssigner
+from equidistant.leagues import leagues, year_range
+from equidistant.raster import background, team_palette, apply_stripes, row_index
+from equidistant.registry import league_teams, load_league
+from equidistant.stripes import split_shared
+from equidistant.timeline import epochs
+
+
+# Points per block when a query reads every year
+block = 2**18
+
+
+class History:
+    """
+    owners is a (years, points) array of palette indices, memory-mapped from owners.npy
+    teams names the team of each palette index. Team arguments take a team name or a
+    palette index
+    """
+
+    def __init__(self, directory, mode = 'r'):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.league = self.meta['league']
+        self.first_year = self.meta['first_year']
+        self.last_year = self.meta['last_year']
+        self.palette = self.meta['palette']
+        self.teams = self.meta['teams']
+        self.owners = np.load(os.path.join(directory, 'owners.npy'), mmap_mode = mode)
+        self.points = np.load(os.path.join(directory, 'points.npy'), mmap_mode = 'r')
+
+    @property
+    def years(self):
+        return np.arange(self.first_year, self.last_year + 1)
+
+    def row(self, yr):
+        if not self.first_year <= yr <= self.last_year:
+            raise ValueError('{} is outside {} to {}'.format(yr, self.first_year, self.last_year))
+        return yr - self.first_year
+
+    def team_index(self, team):
+        return team if isinstance(team, (int, np.integer)) else self.teams.index(team)
+
+    def year(self, yr):
+        """Palette index of every point's team in a year"""
+        return np.asarray(self.owners[self.row(yr)])
+
+    def colors(self, yr):
+        """Hex color of every point's team in a year"""
+        return np.array(self.palette)[self.year(yr)]
+
+    def changed(self, yr, since = None):
+        """Indices of the points whose team in yr differs from since, by default the year before"""
+        since = yr - 1 if since is None else since
+        return np.flatnonzero(self.year(yr) != self.year(since))
+
+    def owner_count(self, index = None):
+        """Number of different teams each point has had, or only the points at index"""
+        owners = self.owners if index is None else self.owners[:, index]
+        counts = np.empty(owners.shape[1], dtype = np.int64)
+        for start in range(0, owners.shape[1], block):
+            chunk = np.asarray(owners[:, start : start + block])
+            seen = np.zeros((chunk.shape[1], len(self.palette)), dtype = bool)
+            columns = np.arange(chunk.shape[1])
+            for values in chunk:
+                seen[columns, values] = True
+            seen[:, background] = False
+            counts[start : start + block] = seen.sum(axis = 1)
+        return counts
+
+    def first_owned(self, team, index = None):
+        """First year a team had each point, or -1 where it never did"""
+        team = self.team_index(team)
+        owners = self.owners if index is None else self.owners[:, index]
+        years = np.full(owners.shape[1], -1, dtype = np.int64)
+        for start in range(0, owners.shape[1], block):
+            owned = np.asarray(owners[:, start : start + block]) == team
+            found = owned.any(axis = 0)
+            years[start : start + block][found] = self.first_year + owned.argmax(axis = 0)[found]
+        return years
+
+    def nearest(self, latitude, longitude):
+        """Index of the point closest to a latitude and longitude"""
+        return int(np.argmin(
+            (self.points[:, 0] - latitude)**2 + (self.points[:, 1] - longitude)**2
+        ))
+
+    def timeline(self, index):
+        """[start, end, team, color] for each run of years a point had the same team"""
+        values = np.asarray(self.owners[:, index])
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        ends = np.r_[starts[1:], len(values)] - 1
+        return [
+            [
+                self.first_year + int(i)
+                , self.first_year + int(j)
+                , self.teams[values[i]]
+                , self.palette[values[i]]
+            ]
+            for i, j in zip(starts, ends)
+        ]
+
+
+def create_history(directory, league, points, palette, first_year, last_year, metric, teams = None):
+    """
+    Empty History open for writing, with every point at no team
+    teams names each palette entry, as from team_palette, or None to name them by color
+    Indices are uint8, or uint16 for palettes of more than 256 colors
+    """
+    os.makedirs(directory, exist_ok = True)
+    points = np.asarray(points, dtype = np.float32)
+    dtype = np.uint8 if len(palette) <= 256 else np.uint16
+    owners = np.lib.format.open_memmap(
+        os.path.join(directory, 'owners.npy')
+        , mode = 'w+'
+        , dtype = dtype
+        , shape = (last_year - first_year + 1, len(points))
+    )
+    owners[:] = background
+    owners.flush()
+    del owners
+    np.save(os.path.join(directory, 'points.npy'), points)
+
+    meta = {
+        'league' : league
+        , 'first_year' : first_year
+        , 'last_year' : last_year
+        , 'palette' : list(palette)
+        , 'teams' : list(palette) if teams is None else list(teams)
+        , 'metric' : metric
+        , 'count' : len(points)
+    }
+    try:
+        meta['points_version'] = load_meta()['version']
+    except FileNotFoundError:
+        meta['points_version'] = None
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent = 1)
+    return History(directory, mode = 'r+')
+
+
+def write_epoch(history, epoch, values):
+    """Fill every year of an epoch with one map's palette indices"""
+    start = max(epoch.start, history.first_year)
+    end = min(epoch.end, history.last_year)
+    if start <= end:
+        history.owners[history.row(start) : history.row(end) + 1] = values
+
+
+def build_history(league, directory, points = None, first_year = None, last_year = None):
+    """Find the closest team to every point in every year of a league and save it as a History"""
+    stadia, stripes = load_league(league)
+    metric = leagues[league]['metric']
+    default_first, default_last = year_range(league, stadia)
+    first_year = default_first if first_year is None else first_year
+    last_year = default_last if last_year is None else last_year
+    if points is None:
+        points = load_points()[0]
+    points = np.asarray(points, dtype = float)
+
+    palette, lookup, index, teams = team_palette(stadia, league_teams(league))
+    history = create_history(directory, league, points, palette, first_year, last_year, metric, teams)
+
+    assigner = IncrementalAssigner(points, stadia, metric)
+    for epoch in epochs(stadia, stripes, first_year, last_year):
+        if len(epoch.rows) == 0:
+            continue # stays at no team
+        assigner.update(epoch.rows)
+        values = index[split_shared(assigner.labels, points, stadia, epoch.rows)]
+        rules_lookup = row_index([stadia[i] for i in epoch.rows], lookup, index[epoch.rows])[1]
+        write_epoch(history, epoch, apply_stripes(values, points, epoch.stripes, rules_lookup))
+    history.owners.flush()
+    return History(directory)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Closest team to every place in every year')
+    parser.add_argument('league', choices = list(leagues))
+    parser.add_argument('-o', '--output', help = 'folder, by default "<league> history"')
+    parser.add_argument('--first-year', type = int)
+    parser.add_argument('--last-year', type = int)
+    args = parser.parse_args()
+
+    build_history(
+        args.league
+        , args.output or args.league + ' history'
+        , first_year = args.first_year
+        , last_year = args.last_year
+    )
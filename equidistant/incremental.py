@@ -0,0 +1,86 @@
+# Carry the closest stadium for every point from one year to the next
+# When a team moves, only points near the old and new stadium can change owner:
+#   a new stadium only takes points that are closer to it than to their current owner
+#   a removed stadium only gives up its own points, which go to the closest one left
+# Stadiums are identified by coordinates and color, so a team listed again with the
+# same stadium in a new row is not treated as a move
+
+import numpy as np
+
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.distance import as_points, distance
+
+
+class IncrementalAssigner:
+    """
+    Closest stadium row and distance to it for every point, updated year over year
+    labels index into stadia, the same list that rows passed to update index into
+    """
+
+    def __init__(self, points, stadia, metric = 'pythagorean'):
+        self.points = as_points(points) # trig is kept from year to year
+        self.stadia = stadia
+        self.metric = metric
+        self.coords = stadium_coords(stadia)
+        self.keys = [(i[1], i[2], i[3]) for i in stadia]
+        self.active = {} # stadium key: row
+        self.labels = None
+        self.dist = None
+        self.changed = None
+
+    def update(self, rows):
+        """
+        Move to a new list of active stadium rows
+        Returns a boolean mask of the points whose closest stadium changed, also kept
+        as self.changed for drawing a map of changes
+        """
+        active = {}
+        for row in rows:
+            active.setdefault(self.keys[row], row) # first listed wins ties, like nearest_stadium
+        new_rows = np.array(list(active.values()), dtype = np.intp)
+        if len(new_rows) == 0:
+            raise ValueError('No stadiums to measure distance to')
+
+        if self.labels is None:
+            closest, self.dist = nearest_stadium(
+                self.points, self.coords[new_rows], metric = self.metric, return_distance = True
+            )
+            self.labels = new_rows[closest]
+            self.changed = np.ones(len(self.points), dtype = bool)
+            self.active = active
+            return self.changed
+
+        # Point kept stadiums at their new row, and removed ones at -1
+        remap = np.full(len(self.stadia), -1, dtype = np.intp)
+        for key, row in self.active.items():
+            if key in active:
+                remap[row] = active[key]
+        old_labels = remap[self.labels]
+        labels = old_labels.copy()
+        dist = self.dist.copy()
+
+        # Removed stadiums hand their points to the closest one still active
+        orphans = np.flatnonzero(old_labels < 0)
+        if len(orphans):
+            closest, dist[orphans] = nearest_stadium(
+                self.points[orphans], self.coords[new_rows], metric = self.metric
+                , return_distance = True
+            )
+            labels[orphans] = new_rows[closest]
+
+        # New stadiums take the points that are closer to them than to their owner
+        order = np.full(len(self.stadia), len(new_rows), dtype = np.intp)
+        order[new_rows] = np.arange(len(new_rows))
+        for key, row in active.items():
+            if key in self.active:
+                continue
+            d = distance(self.points, self.coords[[row]], self.metric)[:, 0]
+            closer = (d < dist) | ((d == dist) & (order[row] < order[labels]))
+            labels[closer] = row
+            dist[closer] = d[closer]
+
+        self.changed = labels != old_labels
+        self.labels = labels
+        self.dist = dist
+        self.active = active
+        return self.changed
@@ -0,0 +1,110 @@
+# Each league's stadium table, read straight from its script or notebook
+# The tables stay where they are edited. This finds the stadia_alltime = [...] and
+# stripes = [...] literals in the source and evaluates just those, so nothing else
+# in the notebook runs, and the rows it hands back are new lists every time
+# equidistant.registry parses and checks them
+
+import io
+import json
+import os
+import re
+import tokenize
+
+import numpy as np
+
+
+# Folder holding the league scripts and notebooks
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# source: where stadia_alltime lives
+# metric: distance the league's maps use
+# first_year: first year to map, None for the first year in the table
+leagues = {
+    'NFL' : {'source' : 'NFL equidistant areas.py', 'metric' : 'pythagorean', 'first_year' : 1920}
+    , 'MLB' : {'source' : 'MLB equidistant areas.ipynb', 'metric' : 'haversine', 'first_year' : None}
+    , 'NBA' : {'source' : 'NBA equidistant areas.ipynb', 'metric' : 'pythagorean', 'first_year' : None}
+    , 'NHL' : {'source' : 'NHL equidistant areas.ipynb', 'metric' : 'haversine', 'first_year' : None}
+    , 'NWSL' : {'source' : 'NWSL equidistant areas.ipynb', 'metric' : 'haversine', 'first_year' : None}
+    , 'WNBA' : {'source' : 'WNBA equidistant areas.ipynb', 'metric' : 'haversine', 'first_year' : None}
+}
+
+delims = ['°', '′', '″']
+divisors = [1., 60., 3600.]
+
+
+def parse_coordinates(text):
+    """
+    (latitude, longitude) in decimal from coordinates as entered, either
+    like '36°05′27″N 115°11′01″W' or '40.8308, -73.9375'
+    """
+    if delims[0] in text:
+        lat = 0
+        for j in range(len(delims)):
+            start = 0 if j == 0 else text.find(delims[j - 1]) + 1
+            lat += float(text[start : text.find(delims[j])]) / divisors[j]
+
+        lon = 0
+        for j in range(len(delims)):
+            start = text.find(' ') + 1 if j == 0 else text.rfind(delims[j - 1]) + 1
+            lon += float(text[start : text.rfind(delims[j])]) / divisors[j]
+        return lat, lon * -1 # Western hemisphere is negative in decimal
+
+    if ', -' in text:
+        return float(text[: text.find(',')]), float(text[text.find(' ') + 1 :])
+
+    raise ValueError('Please reformat: {}'.format(text))
+
+
+def source_code(league):
+    """Python source of a league's script, or all code cells of its notebook"""
+    path = os.path.join(root, leagues[league]['source'])
+    with open(path, encoding = 'utf-8') as f:
+        if path.endswith('.ipynb'):
+            cells = json.load(f)['cells']
+            return '\n'.join(''.join(c['source']) for c in cells if c['cell_type'] == 'code')
+        return f.read()
+
+
+def find_literal(code, name):
+    """Source text of the list assigned to name at the start of a line, or None"""
+    found = re.search(r'^{} = \['.format(name), code, re.MULTILINE)
+    if found is None:
+        return None
+
+    # Walk tokens to the matching bracket so brackets in strings and comments don't count
+    start = found.end() - 1
+    depth = 0
+    lines = code[start :].splitlines(True)
+    offsets = np.cumsum([0] + [len(i) for i in lines])
+    for token in tokenize.generate_tokens(io.StringIO(code[start :]).readline):
+        if token.type == tokenize.OP and token.string in '([{':
+            depth += 1
+        elif token.type == tokenize.OP and token.string in ')]}':
+            depth -= 1
+            if depth == 0:
+                row, col = token.end
+                return code[start : start + offsets[row - 1] + col]
+    raise ValueError('Unclosed {} in source'.format(name))
+
+
+def read_tables(league, code = None):
+    """
+    stadia_alltime and stripes for a league as entered, from code or its source
+    Parsing and checking is equidistant.registry's
+    """
+    if league not in leagues:
+        raise ValueError('Unknown league: {}'.format(league))
+    code = source_code(league) if code is None else code
+    stadia = eval(find_literal(code, 'stadia_alltime'), {'np' : np})
+    stripes_text = find_literal(code, 'stripes')
+    stripes = eval(stripes_text, {'np' : np}) if stripes_text else []
+    return stadia, stripes
+
+
+def year_range(league, stadia):
+    """First and last years to map for a league"""
+    first_year = leagues[league]['first_year']
+    if first_year is None:
+        first_year = int(min(i[4] for i in stadia))
+    last_year = int(max(j for i in stadia for j in i[4 : 6] if np.isfinite(j)))
+    return first_year, last_year
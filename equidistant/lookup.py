@@ -0,0 +1,188 @@
+# Which team is closest to a place in a given year, without drawing any maps
+# Indexes are built once per league from its stadium table and kept in memory:
+# the league's epochs, and each epoch's stadiums ready to compare against
+#
+#   closest_team(38.627, -90.199, 'NFL', 2021)
+#   closest_teams(points, 'MLB', years)
+#
+# From a terminal:
+#   python -m equidistant.lookup NFL 2021 38.627 -90.199
+#   python -m equidistant.lookup --serve 8000
+#   then http://localhost:8000/?league=NFL&year=2021&lat=38.627&lon=-90.199
+
+import argparse
+import bisect
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.distance import distance
+from equidistant.leagues import leagues, year_range
+from equidistant.registry import league_teams, load_league
+from equidistant.spatial import unit_xyz
+from equidistant.stripes import co_tenants, pick_tenant
+from equidistant.timeline import epochs
+
+
+class LeagueIndex:
+    """A league's stadiums by epoch, for closest stadium lookups in any year"""
+
+    def __init__(self, league):
+        self.league = league
+        self.stadia, self.stripes = load_league(league)
+        self.teams = league_teams(league) # team of each row
+        self.metric = leagues[league]['metric']
+        self.first_year, self.last_year = year_range(league, self.stadia)
+        self.timeline = epochs(self.stadia, self.stripes, self.first_year, self.last_year)
+        self.starts = [e.start for e in self.timeline]
+        self.coords = [stadium_coords([self.stadia[i] for i in e.rows]) for e in self.timeline]
+        # For single points: closest by great circle is the largest dot product of unit vectors
+        self.xyz = [unit_xyz(c) for c in self.coords]
+        # Teams sharing each epoch's stadiums, to stripe them like the maps do
+        self.shared = [co_tenants(self.stadia, e.rows) for e in self.timeline]
+
+    def epoch_of(self, year):
+        """Position of the epoch holding year in self.timeline, or -1 if no team had home games"""
+        n = bisect.bisect_right(self.starts, year) - 1
+        if n < 0 or year > self.timeline[n].end or len(self.timeline[n].rows) == 0:
+            return -1
+        return n
+
+    def closest(self, lat, lon, year):
+        """
+        Row of self.stadia closest to one place in a year
+        At a shared stadium, the row of the team whose stripe the place is in
+        """
+        n = self.epoch_of(year)
+        if n < 0:
+            raise ValueError('No {} home games in {}'.format(self.league, year))
+        if self.metric == 'haversine':
+            phi, lam = np.radians(lat), np.radians(lon)
+            here = np.array([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+            nearest = np.argmax(self.xyz[n] @ here)
+        elif self.metric == 'pythagorean':
+            coords = self.coords[n]
+            nearest = np.argmin((coords[:, 0] - lat)**2 + (coords[:, 1] - lon)**2)
+        else:
+            nearest = np.argmin(distance([[lat, lon]], self.coords[n], self.metric)[0])
+        row = self.timeline[n].rows[nearest]
+        return int(pick_tenant(np.array([row]), [[lat, lon]], *self.shared[n])[0])
+
+    def closest_many(self, points, years):
+        """
+        Rows of self.stadia closest to (N, 2) [latitude, longitude] points, one year per
+        point or one year for all of them, striped at shared stadiums like closest.
+        -1 where the league had no home games
+        """
+        points = np.asarray(points, dtype = float).reshape(-1, 2)
+        years = np.broadcast_to(np.asarray(years), (len(points),))
+        epoch = np.searchsorted(self.starts, years, side = 'right') - 1
+        ends = np.array([e.end for e in self.timeline])
+        epoch[(epoch < 0) | (years > ends[np.maximum(epoch, 0)])] = -1
+
+        rows = np.full(len(points), -1, dtype = np.intp)
+        order = np.argsort(epoch, kind = 'stable')
+        bounds = np.searchsorted(epoch[order], np.arange(-1, len(self.timeline) + 1))
+        for n in range(len(self.timeline)):
+            these = order[bounds[n + 1] : bounds[n + 2]]
+            if len(these) == 0 or len(self.timeline[n].rows) == 0:
+                continue
+            nearest = nearest_stadium(
+                points[these]
+                , self.coords[n]
+                , metric = self.metric
+                , use_index = self.metric == 'haversine'
+            )
+            rows[these] = pick_tenant(self.timeline[n].rows[nearest], points[these], *self.shared[n])
+        return rows
+
+
+# Built on first use, then kept
+_indexes = {}
+
+
+def league_index(league):
+    """LeagueIndex for a league, built once"""
+    if league not in _indexes:
+        _indexes[league] = LeagueIndex(league)
+    return _indexes[league]
+
+
+def closest_team(lat, lon, league, year):
+    """Name of the team closest to a place in a year. Its stadium row is league_index(league).closest's"""
+    index = league_index(league)
+    return index.teams[index.closest(lat, lon, year)]
+
+
+def closest_teams(points, league, years):
+    """
+    Names of the closest team to each (N, 2) [latitude, longitude] point, with one year
+    per point or one for all of them. Empty string where the league had no home games
+    Stadium rows are closest_rows(points, league, years)
+    """
+    index = league_index(league)
+    rows = index.closest_many(points, years)
+    names = np.array(index.teams + [''])
+    return names[rows] # -1 picks the empty string
+
+
+def closest_rows(points, league, years):
+    """Like closest_teams, but indices into the league's stadium rows, -1 for none"""
+    return league_index(league).closest_many(points, years)
+
+
+def describe(row, team = None):
+    """Dict of a stadium row, and its team if given, for printing or JSON"""
+    return {
+        'team' : team
+        , 'coordinates' : row[0]
+        , 'latitude' : row[1]
+        , 'longitude' : row[2]
+        , 'color' : row[3]
+        , 'start' : row[4]
+        , 'end' : None if np.isinf(row[5]) else row[5]
+    }
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """GET /?league=NFL&year=2021&lat=38.627&lon=-90.199 answers with JSON"""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            index = league_index(query['league'][0])
+            n = index.closest(float(query['lat'][0]), float(query['lon'][0]), int(query['year'][0]))
+            status, body = 200, describe(index.stadia[n], index.teams[n])
+        except (KeyError, ValueError) as e:
+            status, body = 400, {'error' : str(e)}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Closest team to a place in a given year')
+    parser.add_argument('league', nargs = '?', choices = list(leagues))
+    parser.add_argument('year', nargs = '?', type = int)
+    parser.add_argument('lat', nargs = '?', type = float)
+    parser.add_argument('lon', nargs = '?', type = float)
+    parser.add_argument('--serve', type = int, metavar = 'PORT', help = 'answer lookups over HTTP')
+    args = parser.parse_args()
+
+    if args.serve:
+        for league in leagues:
+            league_index(league)
+        print('Serving on port', args.serve)
+        HTTPServer(('localhost', args.serve), LookupHandler).serve_forever()
+    elif None in (args.league, args.year, args.lat, args.lon):
+        parser.error('league, year, lat and lon are needed unless serving')
+    else:
+        index = league_index(args.league)
+        n = index.closest(args.lat, args.lon, args.year)
+        print(json.dumps(describe(index.stadia[n], index.teams[n]), indent = 1, ensure_ascii = False))
@@ -0,0 +1,98 @@
+# Draw a league's epochs in parallel across processes
+# The points go into shared memory once and every worker maps the same buffer,
+# instead of each one getting its own copy of the DataFrame
+# Each worker finds the closest team for a whole epoch and sends back the finished map
+#
+# Scripts using this need their run behind if __name__ == '__main__':, since worker
+# processes on Windows start by importing the script
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from equidistant.cache import epoch_key, points_version
+from equidistant.distance import PointSet
+from equidistant.pipeline import epoch_grid
+from equidistant.raster import BBox, size
+
+
+# Set in each worker by attach()
+_shm = None
+_points = None
+
+
+def share(points):
+    """Copy points into a new shared memory block, which the caller must close and unlink"""
+    points = np.ascontiguousarray(points)
+    shm = shared_memory.SharedMemory(create = True, size = max(points.nbytes, 1))
+    np.ndarray(points.shape, dtype = points.dtype, buffer = shm.buf)[:] = points
+    return shm
+
+
+def attach(name, shape, dtype):
+    """Worker initializer: map the shared points, keeping their trig for every epoch the worker draws"""
+    global _shm, _points
+    _shm = shared_memory.SharedMemory(name = name)
+    _points = PointSet(np.ndarray(shape, dtype = dtype, buffer = _shm.buf))
+
+
+def _epoch_grid(rows, epoch, lookup, metric, use_index, bbox, size, index):
+    return epoch_grid(_points, rows, epoch, lookup, metric, use_index, bbox, size, index)
+
+
+def render_epochs(points, stadia, timeline, lookup, metric = 'pythagorean', use_index = False
+                  , workers = None, bbox = BBox, size = size, cache = None, index = None):
+    """
+    Yield (epoch, grid) for every epoch in timeline, in order, while workers draw ahead
+    workers is the number of processes, None for one per core
+    With a ResultCache, maps drawn before are read from it and only the rest are drawn
+    index is the palette index of every stadium row, None to color rows by lookup
+    """
+    points = np.asarray(points)
+    keys = [None] * len(timeline)
+    grids = [None] * len(timeline)
+    if cache is not None:
+        version = points_version(points)
+        for n, epoch in enumerate(timeline):
+            keys[n] = epoch_key(stadia, epoch, lookup, metric, version, index
+                                , kind = 'grid', bbox = bbox, size = size)
+            grids[n] = cache.get(keys[n])
+        if all(i is not None for i in grids):
+            yield from zip(timeline, grids)
+            return
+
+    shm = share(points)
+    try:
+        with ProcessPoolExecutor(
+            max_workers = workers
+            , initializer = attach
+            , initargs = (shm.name, points.shape, points.dtype.str)
+        ) as pool:
+            futures = []
+            for epoch, grid in zip(timeline, grids):
+                if grid is not None:
+                    futures.append(None)
+                    continue
+                # Only send the epoch's own rows, renumbered from 0
+                rows = [stadia[i] for i in epoch.rows]
+                futures.append(pool.submit(
+                    _epoch_grid
+                    , rows
+                    , epoch._replace(rows = np.arange(len(rows)))
+                    , lookup
+                    , metric
+                    , use_index
+                    , bbox
+                    , size
+                    , None if index is None else np.asarray(index)[epoch.rows]
+                ))
+            for epoch, key, grid, future in zip(timeline, keys, grids, futures):
+                if grid is None:
+                    grid = future.result()
+                    if cache is not None:
+                        cache.put(key, grid)
+                yield epoch, grid
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,40 @@
+# One epoch of a league, from stadium rows to a finished map
+# Used by the parallel driver, and by anything else that needs a map without the scripts
+
+import numpy as np
+
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.cache import epoch_key, points_version
+from equidistant.raster import BBox, size, apply_stripes, row_index, splat, draw_stadiums
+from equidistant.stripes import split_shared
+
+
+def epoch_values(points, stadia, epoch, lookup, metric = 'pythagorean', use_index = False
+                 , index = None, cache = None, points_id = None):
+    """
+    Palette index of the closest team for every point in an epoch, with stripes
+    index is the palette index of every row of stadia, as from team_palette, or
+    None to color rows by lookup
+    With a ResultCache, an epoch mapped before on the same points is read from it,
+    and a new one is saved to it. points_id is the points' points_version, worked
+    out here if not given
+    """
+    if cache is not None:
+        if points_id is None:
+            points_id = points_version(np.asarray(points))
+        key = epoch_key(stadia, epoch, lookup, metric, points_id, index, kind = 'values')
+        return cache.fetch(key, lambda: epoch_values(points, stadia, epoch, lookup, metric, use_index, index))
+
+    rows = [stadia[i] for i in epoch.rows]
+    closest = nearest_stadium(points, stadium_coords(rows), metric = metric, use_index = use_index)
+    closest = split_shared(closest, points, rows)
+    colors, lookup = row_index(rows, lookup, None if index is None else np.asarray(index)[epoch.rows])
+    return apply_stripes(colors[closest], points, epoch.stripes, lookup)
+
+
+def epoch_grid(points, stadia, epoch, lookup, metric = 'pythagorean', use_index = False
+               , bbox = BBox, size = size, index = None):
+    """Map of an epoch as a (height, width) array of palette indices, with stadium dots"""
+    values = epoch_values(points, stadia, epoch, lookup, metric, use_index, index)
+    grid = splat(points, values, bbox, size)
+    return draw_stadiums(grid, stadium_coords([stadia[i] for i in epoch.rows]), bbox)
@@ -0,0 +1,249 @@
+# Where the time goes in a long run: each stage of each year, timed as it happens
+# Wrap each stage in tracer.stage('assign', yr, points = n) and call tracer.step(yr)
+# after each year. Every stage records its wall time, points per second and the memory
+# in use after it, a progress bar with an ETA is kept up to date, and the trace is
+# saved as JSON lines (.jsonl, written as it goes, so a stopped run keeps what it did)
+# or as a Chrome trace (.json, for chrome://tracing or ui.perfetto.dev)
+# profile_path turns on cProfile for the stages in profile_stages only, the hot path,
+# and saves its stats for pstats or snakeviz
+
+import cProfile
+from contextlib import contextmanager
+import io
+import json
+import os
+import pstats
+import sys
+import time
+
+try:
+    import resource # not on Windows
+except ImportError:
+    resource = None
+
+
+# Stages of a year's map, in order
+stage_names = ['load', 'filter', 'assign', 'stripe', 'render', 'save', 'encode']
+
+# Stages run under cProfile when a profile_path is given
+profile_stages = ('assign', 'stripe')
+
+bar_width = 30
+
+# Seconds between redraws of the progress bar
+redraw_every = 0.2
+
+
+def rss_mb():
+    """Resident memory of this process in MB now, or the peak where now can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss():
+    """Peak resident memory of this process in MB, or None where it can't be read"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10 # bytes on macOS, KB elsewhere
+
+
+def duration(seconds):
+    """Seconds as 1h02m, 3m12s or 45s"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return '{}h{:02d}m'.format(seconds // 3600, seconds % 3600 // 60)
+    if seconds >= 60:
+        return '{}m{:02d}s'.format(seconds // 60, seconds % 60)
+    return '{}s'.format(seconds)
+
+
+class Tracer:
+    """
+    Stage timings of a run of total years, with a progress bar on stream
+    path is where the trace goes, .jsonl or a Chrome trace .json, or None to keep it
+    in events only. progress False leaves the bar out
+    """
+
+    def __init__(self, total = None, label = '', path = None, progress = True, stream = None
+                 , profile_path = None, profile_stages = profile_stages):
+        self.total = total
+        self.label = label
+        self.path = path
+        self.progress = progress
+        self.stream = sys.stderr if stream is None else stream
+        self.profile_path = profile_path
+        self.profile_stages = profile_stages
+        self.profiler = cProfile.Profile() if profile_path else None
+        self.events = []
+        self.done = 0
+        self.year = None
+        self.started = time.perf_counter()
+        self.drawn = 0.
+        self.bar_shown = False
+        self.lines = None
+        if path is not None and path.endswith('.jsonl'):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+            self.lines = open(path, 'w')
+
+    def now(self):
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def stage(self, name, year = None, points = None, **details):
+        """Time the block under name, for a year and a number of points if given"""
+        profiled = self.profiler is not None and name in self.profile_stages
+        start = self.now()
+        if profiled:
+            self.profiler.enable()
+        try:
+            yield
+        finally:
+            if profiled:
+                self.profiler.disable()
+            self.record(name, start, self.now() - start, year, points, **details)
+
+    def record(self, name, start, seconds, year = None, points = None, **details):
+        """Add a finished stage that was timed elsewhere"""
+        event = {
+            'stage' : name
+            , 'year' : year
+            , 'start' : start
+            , 'seconds' : seconds
+            , 'points' : points
+            , 'points_per_second' : None if points is None or seconds <= 0 else points / seconds
+            , 'rss_mb' : rss_mb()
+        }
+        event.update(details)
+        self.events.append(event)
+        if self.lines is not None:
+            self.lines.write(json.dumps(event) + '\n')
+            self.lines.flush()
+        return event
+
+    def step(self, year = None, count = 1):
+        """Count years as done and redraw the progress bar"""
+        self.done += count
+        self.year = year
+        if self.progress and (self.now() - self.drawn >= redraw_every or self.done == self.total):
+            self.draw()
+
+    def eta(self):
+        """Seconds left at the pace so far, or None before the first year or without a total"""
+        if not self.total or not self.done:
+            return None
+        return self.now() / self.done * (self.total - self.done)
+
+    def draw(self):
+        self.drawn = self.now()
+        if self.total:
+            filled = round(bar_width * min(self.done / self.total, 1))
+            bar = '[{}{}] {}/{}'.format('#' * filled, '.' * (bar_width - filled), self.done, self.total)
+        else:
+            bar = '{} done'.format(self.done)
+        left = self.eta()
+        text = '{} {} {}  {} elapsed{}  {:.0f}MB'.format(
+            self.label
+            , bar
+            , '' if self.year is None else self.year
+            , duration(self.now())
+            , '' if left is None else ', ETA ' + duration(left)
+            , rss_mb() or 0
+        )
+        self.stream.write('\r' + text.strip() + '\033[K')
+        self.stream.flush()
+        self.bar_shown = True
+
+    def clear(self):
+        """Take the progress bar off its line, before printing something else"""
+        if self.bar_shown:
+            self.stream.write('\r\033[K')
+            self.stream.flush()
+            self.bar_shown = False
+
+    def summary(self):
+        """{stage: {'seconds', 'count', 'points_per_second', 'max_rss_mb'}} over the whole run"""
+        found = {}
+        for event in self.events:
+            total = found.setdefault(event['stage'], {'seconds' : 0., 'count' : 0, 'points' : 0, 'max_rss_mb' : None})
+            total['seconds'] += event['seconds']
+            total['count'] += 1
+            total['points'] += event['points'] or 0
+            if event['rss_mb'] is not None:
+                total['max_rss_mb'] = max(total['max_rss_mb'] or 0, event['rss_mb'])
+        for total in found.values():
+            points = total.pop('points')
+            total['points_per_second'] = points / total['seconds'] if points and total['seconds'] > 0 else None
+        order = {name : n for n, name in enumerate(stage_names)}
+        return dict(sorted(found.items(), key = lambda i: order.get(i[0], len(order))))
+
+    def report(self):
+        """Lines of each stage's share of the time"""
+        summary = self.summary()
+        total = sum(i['seconds'] for i in summary.values()) or 1
+        lines = ['{:<8} {:>10} {:>5.1f}%  {:>6} times{}'.format(
+            name
+            , duration(i['seconds']) if i['seconds'] >= 1 else '{:.3f}s'.format(i['seconds'])
+            , 100 * i['seconds'] / total
+            , i['count']
+            , '' if i['points_per_second'] is None else '  {:,.0f} points/s'.format(i['points_per_second'])
+        ) for name, i in summary.items()]
+        lines.append('total    {:>10}  peak {:.0f}MB'.format(duration(self.now()), peak_rss() or 0))
+        return lines
+
+    def chrome_trace(self):
+        """The events as a Chrome trace: a slice per stage and a memory counter"""
+        pid = os.getpid()
+        trace = []
+        for event in self.events:
+            trace.append({
+                'name' : event['stage']
+                , 'ph' : 'X'
+                , 'ts' : event['start'] * 1e6
+                , 'dur' : event['seconds'] * 1e6
+                , 'pid' : pid
+                , 'tid' : 0
+                , 'args' : {k : v for k, v in event.items() if k not in ('stage', 'start', 'seconds')}
+            })
+            if event['rss_mb'] is not None:
+                trace.append({
+                    'name' : 'memory'
+                    , 'ph' : 'C'
+                    , 'ts' : (event['start'] + event['seconds']) * 1e6
+                    , 'pid' : pid
+                    , 'args' : {'rss_mb' : event['rss_mb']}
+                })
+        return {'traceEvents' : trace, 'displayTimeUnit' : 'ms', 'otherData' : {'label' : self.label}}
+
+    def close(self):
+        """End the progress bar and save the trace and profile"""
+        if self.bar_shown:
+            self.stream.write('\n')
+            self.stream.flush()
+            self.bar_shown = False
+        if self.lines is not None:
+            self.lines.write(json.dumps({'summary' : self.summary(), 'seconds' : self.now()}) + '\n')
+            self.lines.close()
+            self.lines = None
+        elif self.path is not None:
+            with open(self.path, 'w') as f:
+                json.dump(self.chrome_trace(), f)
+        if self.profiler is not None:
+            self.profiler.dump_stats(self.profile_path)
+
+    def profile_report(self, limit = 20, sort = 'cumulative'):
+        """Top functions of the profiled stages, as text"""
+        if self.profiler is None:
+            return ''
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream = out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,181 @@
+# Adaptive sampling: only look closely where the answer changes
+# Points deep inside one team's territory all get the same answer, so instead of
+# measuring every GeoNames place, start from coarse cells over the BBox, find the closest
+# stadium at their corners, and split only cells whose corners disagree, down to about a
+# pixel. Cells holding a stadium are always split, so no territory falls through a coarse cell
+# Corners are shared between neighbouring cells and levels and measured once
+
+from collections import namedtuple
+
+import numpy as np
+
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.raster import BBox, size, background, apply_stripes, draw_stadiums, pixel_centers, row_index, splat
+from equidistant.stripes import split_shared
+
+
+# cells: (C, 4) [south, west, north, east], labels: (C,) index of the closest stadium
+# evaluations: how many points were measured
+Quadtree = namedtuple('Quadtree', ['cells', 'labels', 'evaluations'])
+
+# Coarse cell size in degrees, and times to halve it. 1 / 2**6 is about a pixel on the
+# 2400 x 1600 map, finer than the spacing of the full GeoNames file
+cell = 1.
+levels = 6
+
+
+def refine(stadiums, metric = 'pythagorean', bbox = BBox, cell = cell, levels = levels, use_index = False):
+    """Quadtree of the closest of (M, 2) [latitude, longitude] stadiums over the BBox"""
+    stadiums = np.asarray(stadiums, dtype = float).reshape(-1, 2)
+    finest = 2**levels
+    n_cols = int(np.ceil((bbox[1] - bbox[0]) / cell)) * finest
+    n_rows = int(np.ceil((bbox[3] - bbox[2]) / cell)) * finest
+    d_lon = (bbox[1] - bbox[0]) / n_cols
+    d_lat = (bbox[3] - bbox[2]) / n_rows
+
+    # Corners live on a lattice of the finest cells, rows counted down from the north edge
+    def lattice_key(row, col):
+        return row * (n_cols + 1) + col
+
+    def to_coords(row, col):
+        return np.column_stack([bbox[3] - row * d_lat, bbox[0] + col * d_lon])
+
+    stadium_row = (bbox[3] - stadiums[:, 0]) / d_lat
+    stadium_col = (stadiums[:, 1] - bbox[0]) / d_lon
+
+    known_keys = np.empty(0, dtype = np.int64)
+    known_labels = np.empty(0, dtype = np.intp)
+    evaluations = 0
+
+    step = finest
+    row, col = np.mgrid[0 : n_rows : step, 0 : n_cols : step]
+    row, col = row.ravel().astype(np.int64), col.ravel().astype(np.int64)
+
+    cells, labels = [], []
+    while len(row):
+        corner_row = np.concatenate([row, row, row + step, row + step])
+        corner_col = np.concatenate([col, col + step, col, col + step])
+        keys = lattice_key(corner_row, corner_col)
+
+        # Measure corners not seen at an earlier level
+        new, first = np.unique(keys, return_index = True)
+        unseen = ~np.isin(new, known_keys, assume_unique = True)
+        if unseen.any():
+            new, first = new[unseen], first[unseen]
+            found = nearest_stadium(
+                to_coords(corner_row[first], corner_col[first])
+                , stadiums
+                , metric = metric
+                , use_index = use_index
+            )
+            evaluations += len(new)
+            known_keys = np.concatenate([known_keys, new])
+            known_labels = np.concatenate([known_labels, found])
+            order = np.argsort(known_keys, kind = 'stable')
+            known_keys, known_labels = known_keys[order], known_labels[order]
+
+        corner = known_labels[np.searchsorted(known_keys, keys)].reshape(4, -1)
+        split = (corner != corner[0]).any(axis = 0)
+
+        # A stadium inside a cell means a territory may be hiding in it
+        holds = np.isin(
+            lattice_key(row // step, col // step)
+            , lattice_key(np.floor(stadium_row / step), np.floor(stadium_col / step)).astype(np.int64)
+        )
+        split |= holds
+
+        done = ~split
+        cells.append(np.column_stack([row[done], col[done], np.full(done.sum(), step)]))
+        labels.append(corner[0, done])
+
+        if step == 1:
+            # Finest level: cells still in doubt take the answer at their center
+            center = np.column_stack([
+                bbox[3] - (row[split] + 0.5) * d_lat
+                , bbox[0] + (col[split] + 0.5) * d_lon
+            ])
+            if len(center):
+                labels.append(nearest_stadium(center, stadiums, metric = metric, use_index = use_index))
+                evaluations += len(center)
+                cells.append(np.column_stack([row[split], col[split], np.ones(len(center), dtype = np.int64)]))
+            break
+
+        half = step // 2
+        row, col = row[split], col[split]
+        row = np.concatenate([row, row, row + half, row + half])
+        col = np.concatenate([col, col + half, col, col + half])
+        step = half
+
+    cells = np.concatenate(cells)
+    bounds = np.column_stack([
+        bbox[3] - (cells[:, 0] + cells[:, 2]) * d_lat
+        , bbox[0] + cells[:, 1] * d_lon
+        , bbox[3] - cells[:, 0] * d_lat
+        , bbox[0] + (cells[:, 1] + cells[:, 2]) * d_lon
+    ])
+    return Quadtree(bounds, np.concatenate(labels), evaluations)
+
+
+def centers(tree):
+    """(C, 2) [latitude, longitude] center of every cell, for plotting like points"""
+    return np.column_stack([
+        (tree.cells[:, 0] + tree.cells[:, 2]) / 2
+        , (tree.cells[:, 1] + tree.cells[:, 3]) / 2
+    ])
+
+
+def coverage(points, bbox = BBox, size = size):
+    """(height, width) mask of pixels the dot map would draw, to keep oceans and Canada blank"""
+    return splat(points, np.ones(len(points), dtype = np.uint8), bbox, size) != background
+
+
+def paint(tree, values, bbox = BBox, size = size, mask = None):
+    """(height, width) uint8 map with each cell filled with its palette index"""
+    width, height = size
+    grid = np.full((height, width), background, dtype = np.uint8)
+    values = np.asarray(values)
+
+    scale_col = width / (bbox[1] - bbox[0])
+    scale_row = height / (bbox[3] - bbox[2])
+    col0 = np.round((tree.cells[:, 1] - bbox[0]) * scale_col).astype(np.intp)
+    col1 = np.round((tree.cells[:, 3] - bbox[0]) * scale_col).astype(np.intp)
+    row0 = np.round((bbox[3] - tree.cells[:, 2]) * scale_row).astype(np.intp)
+    row1 = np.round((bbox[3] - tree.cells[:, 0]) * scale_row).astype(np.intp)
+
+    # Cells under a pixel set the pixel their center falls in, larger ones fill their span
+    small = (col1 - col0 <= 1) & (row1 - row0 <= 1)
+    point = centers(tree)[small]
+    r = np.clip(np.floor((bbox[3] - point[:, 0]) * scale_row).astype(np.intp), 0, height - 1)
+    c = np.clip(np.floor((point[:, 1] - bbox[0]) * scale_col).astype(np.intp), 0, width - 1)
+    grid[r, c] = values[small]
+    for k in np.flatnonzero(~small):
+        grid[row0[k] : row1[k], col0[k] : col1[k]] = values[k]
+
+    if mask is not None:
+        grid[~mask] = background
+    return grid
+
+
+def epoch_grid(stadia, epoch, lookup, metric = 'pythagorean', bbox = BBox, size = size
+               , mask = None, use_index = False, index = None):
+    """
+    Map of an epoch like pipeline.epoch_grid, from a quadtree instead of every point
+    Stripes are applied per pixel. Pass mask = coverage(points) to blank where there are no places
+    """
+    rows = [stadia[i] for i in epoch.rows]
+    tree = refine(stadium_coords(rows), metric, bbox, use_index = use_index)
+    colors, lookup = row_index(rows, lookup, None if index is None else np.asarray(index)[epoch.rows])
+
+    # Paint rows, one up so 0 stays blank, then stripe shared stadiums pixel by pixel
+    labels = paint(tree, tree.labels + 1, bbox, size, mask)
+    filled = labels.ravel() != background
+    pixels = pixel_centers(bbox, size)[filled]
+    values = apply_stripes(
+        colors[split_shared(labels.ravel()[filled].astype(np.intp) - 1, pixels, rows)]
+        , pixels
+        , epoch.stripes
+        , lookup
+    )
+    grid = np.full(labels.shape, background, dtype = np.uint8)
+    grid.ravel()[filled] = values
+    return draw_stadiums(grid, stadium_coords(rows), bbox)
@@ -0,0 +1,172 @@
+# Draw maps straight into an 8-bit paletted image instead of a matplotlib scatter plot
+# A map is a (height, width) array of palette indices over the BBox:
+#   splat() drops each geographic point onto its pixel
+#   pixel_centers() gives points to assign so every pixel can be filled instead
+# Stripes and stadium dots are numpy operations on those arrays, and PIL writes the PNG
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Coordinates containing continental US, as lon min, lon max, lat min, lat max
+BBox = (-124.7844079, -66.9513812
+        , 24.7433195, 49.3457868)
+
+# Same shape as the (24, 16) inch figures at 100 dpi
+size = (2400, 1600)
+
+background = 0 # transparent
+marker = 1 # black, for stadium dots and titles
+
+
+def hex_to_rgb(hexcode):
+    """(r, g, b) from a color like '#fed02a'"""
+    hexint = int(hexcode.lstrip('#'), 16)
+    return hexint >> 16, hexint >> 8 & 0xFF, hexint & 0xFF
+
+
+def league_palette(colors):
+    """
+    Palette for a league from its team colors, in first listed order
+    Returns the list of hex colors and a dict from color to palette index
+    Index 0 is the transparent background and index 1 is black for markers
+    """
+    palette = ['#ffffff', '#000000']
+    lookup = {}
+    for color in colors:
+        if color not in lookup:
+            lookup[color] = len(palette)
+            palette.append(color)
+    if len(palette) > 256:
+        raise ValueError('Too many colors for an 8-bit palette: {}'.format(len(palette)))
+    return palette, lookup
+
+
+def team_palette(stadia, teams):
+    """
+    Palette with an entry for every team and color, in first listed order, from
+    stadium rows and each row's team as from registry.league_teams
+    Returns the palette, a dict from color to its first palette index for stripe rules,
+    the (N,) uint8 palette index of each row, and the team of each palette entry
+    Teams with the same color get their own entries, so their areas stay apart
+    """
+    palette = ['#ffffff', '#000000']
+    names = [None, None]
+    lookup = {}
+    found = {}
+    index = np.empty(len(stadia), dtype = np.uint8)
+    for n, (row, team) in enumerate(zip(stadia, teams)):
+        if (team, row[3]) not in found:
+            if len(palette) == 256:
+                raise ValueError('Too many teams and colors for an 8-bit palette')
+            found[(team, row[3])] = len(palette)
+            lookup.setdefault(row[3], len(palette))
+            palette.append(row[3])
+            names.append(team)
+        index[n] = found[(team, row[3])]
+    return palette, lookup, index, names
+
+
+def row_index(rows, lookup, index = None):
+    """
+    Palette index of each stadium row, index if given or else its color's in lookup
+    Also returns lookup for the stripe rules in effect, with each color at the
+    palette entries of these rows that have it, first listed first, so a rule
+    reaches every team playing in its from color
+    """
+    if index is None:
+        return np.array([lookup[i[3]] for i in rows], dtype = np.uint8), lookup
+    index = np.asarray(index, dtype = np.uint8)
+    active = {}
+    for row, i in zip(rows, index):
+        if int(i) not in active.setdefault(row[3], []):
+            active[row[3]].append(int(i))
+    return index, {**lookup, **active}
+
+
+def stripe_mask(points):
+    """Diagonal swathes used for stripes, from (N, 2) [latitude, longitude]"""
+    return np.round(points[:, 0] + points[:, 1]) % 2 == 0
+
+
+def apply_stripes(values, points, rules, lookup):
+    """
+    Palette index per point with stripe rules applied, in order
+    Each rule is [year start, year end, from color, to color], and recolors
+    the diagonal swathes of the from color's area in the to color
+    lookup gives each color's palette index, or a list of them from row_index
+    """
+    if len(rules) == 0:
+        return values
+    values = values.copy()
+    swathes = stripe_mask(points)
+    for i in rules:
+        values[np.isin(values, lookup[i[2]]) & swathes] = np.atleast_1d(lookup[i[3]])[0]
+    return values
+
+
+def to_pixels(points, bbox = BBox, size = size):
+    """Row, column and in-frame mask for (N, 2) [latitude, longitude] points"""
+    width, height = size
+    col = np.floor((points[:, 1] - bbox[0]) / (bbox[1] - bbox[0]) * width).astype(np.intp)
+    row = np.floor((bbox[3] - points[:, 0]) / (bbox[3] - bbox[2]) * height).astype(np.intp)
+    inside = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+    return row, col, inside
+
+
+def pixel_centers(bbox = BBox, size = size):
+    """(height * width, 2) [latitude, longitude] of every pixel center, top row first"""
+    width, height = size
+    lon = bbox[0] + (np.arange(width) + 0.5) / width * (bbox[1] - bbox[0])
+    lat = bbox[3] - (np.arange(height) + 0.5) / height * (bbox[3] - bbox[2])
+    lat, lon = np.meshgrid(lat, lon, indexing = 'ij')
+    return np.column_stack([lat.ravel(), lon.ravel()])
+
+
+def splat(points, values, bbox = BBox, size = size, dot = 3):
+    """
+    (height, width) uint8 map with each point's palette index in a dot x dot square
+    Later points draw over earlier ones, like the scatter plot
+    """
+    width, height = size
+    grid = np.full((height, width), background, dtype = np.uint8)
+    row, col, inside = to_pixels(points, bbox, size)
+    row, col, values = row[inside], col[inside], np.asarray(values)[inside]
+    for d_row in range(-(dot // 2), dot - dot // 2):
+        for d_col in range(-(dot // 2), dot - dot // 2):
+            r = np.clip(row + d_row, 0, height - 1)
+            c = np.clip(col + d_col, 0, width - 1)
+            grid[r, c] = values
+    return grid
+
+
+def draw_stadiums(grid, stadiums, bbox = BBox, dot = 7):
+    """Black dots at (M, 2) stadium coordinates, drawn into grid in place"""
+    height, width = grid.shape
+    row, col, inside = to_pixels(np.asarray(stadiums, dtype = float).reshape(-1, 2), bbox, (width, height))
+    for r, c in zip(row[inside], col[inside]):
+        grid[max(r - dot // 2, 0) : r + dot // 2 + 1, max(c - dot // 2, 0) : c + dot // 2 + 1] = marker
+    return grid
+
+
+def to_image(grid, palette, alpha = 1., title = None):
+    """
+    PIL paletted image of a map, ready for .save('... .png')
+    Team colors get alpha for transparency. The background is fully transparent
+    and markers fully opaque
+    """
+    image = Image.fromarray(grid, mode = 'P')
+    image.putpalette([c for color in palette for c in hex_to_rgb(color)])
+    opacity = [0, 255] + [round(alpha * 255)] * (len(palette) - 2)
+    image.info['transparency'] = bytes(opacity)
+
+    if title is not None:
+        font = ImageFont.load_default(size = max(grid.shape[0] // 40, 10))
+        ImageDraw.Draw(image).text(
+            (grid.shape[1] // 2, grid.shape[0] // 100)
+            , title
+            , fill = marker
+            , font = font
+            , anchor = 'ma'
+        )
+    return image
@@ -0,0 +1,232 @@
+# Every league's stadium table, parsed once and checked
+# A league's rows become one NumPy structured array (fields below), with the team of
+# each row, as named in the row itself, an index into the league's team names. Two
+# teams with the same color (Cowboys and Seahawks) stay apart, and a team keeps its
+# index when its color changes. Coordinates are parsed here only, and rows that can't
+# be right (a latitude out of range, a bad color, years backwards, no team) are
+# refused with the row and team named
+# Parsed tables are saved in US_Coords/registry under a hash of the league's source
+# and kept in memory, so a league is only parsed again after its table is edited
+#
+#   python -m equidistant.registry NFL
+
+import argparse
+from collections import namedtuple
+import hashlib
+import os
+import re
+
+import numpy as np
+
+from equidistant.leagues import leagues, parse_coordinates, read_tables, root
+
+
+registry_dir = os.path.join('US_Coords', 'registry')
+
+# Bump when the fields or parsing change, so old saved tables aren't used
+version = 2
+
+stadium_fields = [
+    ('coordinates', 'U48') # as entered
+    , ('latitude', 'f8')
+    , ('longitude', 'f8')
+    , ('color', 'U7')
+    , ('start', 'f8') # years are floats so an end can be np.inf
+    , ('end', 'f8')
+    , ('league', 'U8') # the row's own league, like 'AL' in MLB, or ''
+    , ('team', 'u2') # index into the team names
+]
+
+stripe_fields = [('start', 'f8'), ('end', 'f8'), ('from_color', 'U7'), ('to_color', 'U7')]
+
+Registry = namedtuple('Registry', ['league', 'table', 'teams', 'stripes', 'source_hash'])
+
+hex_color = re.compile(r'#[0-9a-fA-F]{6}$')
+
+_loaded = {} # league: ((modified, size) of its source, folder), Registry)
+
+
+def _is_year(value):
+    return np.isfinite(value) and value == int(value)
+
+
+def _year(value):
+    return int(value) if np.isfinite(value) else np.inf
+
+
+def parse_table(rows):
+    """
+    Structured array of stadium rows, either as entered, [coordinates, color, start, end, team, (league)],
+    or already parsed, [coordinates, latitude, longitude, color, start, end, team, (league)]
+    Latitude and longitude always come from the coordinates, so parsing twice gives the same
+    Returns (table, team names in first listed order)
+    """
+    rests = [row[1 :] if isinstance(row[1], str) else row[3 :] for row in rows]
+    teams = [i[3] if len(i) > 3 and isinstance(i[3], str) else '' for i in rests] # '' refused by check_table
+    names = list(dict.fromkeys(teams))
+    team_ids = {name : n for n, name in enumerate(names)}
+
+    table = np.zeros(len(rows), dtype = stadium_fields)
+    for n, (row, rest, team) in enumerate(zip(rows, rests, teams)):
+        try:
+            lat, lon = parse_coordinates(row[0])
+        except ValueError:
+            lat, lon = np.nan, np.nan # refused by check_table with the others
+        table[n] = (
+            row[0], lat, lon, rest[0], rest[1], rest[2]
+            , rest[4] if len(rest) > 4 else ''
+            , team_ids[team]
+        )
+    return table, names
+
+
+def parse_stripes(stripes):
+    return np.array([tuple(i) for i in stripes], dtype = stripe_fields)
+
+
+def check_table(table, teams, stripes = (), league = ''):
+    """Raise ValueError listing every row or stripe rule that can't be right"""
+    problems = []
+    for n, row in enumerate(table):
+        found = []
+        if not np.isfinite(row['latitude']):
+            found.append('coordinates {!r} can\'t be read'.format(str(row['coordinates'])))
+        elif not (-90 <= row['latitude'] <= 90 and -180 <= row['longitude'] <= 180):
+            found.append('coordinates {!r} are off the globe'.format(str(row['coordinates'])))
+        if not hex_color.match(row['color']):
+            found.append('color {!r} isn\'t #rrggbb'.format(str(row['color'])))
+        if not _is_year(row['start']):
+            found.append('start {:g} isn\'t a year'.format(row['start']))
+        if not (_is_year(row['end']) or row['end'] == np.inf):
+            found.append('end {:g} isn\'t a year or np.inf'.format(row['end']))
+        if row['end'] < row['start']:
+            found.append('ends in {:g} before it starts in {:g}'.format(row['end'], row['start']))
+        if teams[row['team']] == '':
+            found.append('has no team name after its years')
+        problems += ['row {} ({}): {}'.format(n, teams[row['team']] or row['color'], i) for i in found]
+
+    for n, rule in enumerate(stripes):
+        found = [
+            '{} {!r} isn\'t #rrggbb'.format(i, str(rule[i]))
+            for i in ['from_color', 'to_color'] if not hex_color.match(rule[i])
+        ]
+        if rule['end'] < rule['start']:
+            found.append('ends in {:g} before it starts in {:g}'.format(rule['end'], rule['start']))
+        problems += ['stripe {}: {}'.format(n, i) for i in found]
+
+    if problems:
+        raise ValueError('{} stadium table:\n  {}'.format(league, '\n  '.join(problems)))
+
+
+def to_rows(table, teams):
+    """New stadium rows, [coordinates, latitude, longitude, color, start, end, team, (league)]"""
+    rows = []
+    for i in table.tolist():
+        row = [i[0], i[1], i[2], i[3], _year(i[4]), _year(i[5]), teams[i[7]]]
+        if i[6] != '':
+            row.append(i[6])
+        rows.append(row)
+    return rows
+
+
+def to_stripes(stripes):
+    """New stripe rules, [start, end, from color, to color]"""
+    return [[_year(i[0]), _year(i[1]), i[2], i[3]] for i in stripes.tolist()]
+
+
+def parse_rows(rows, stripes = (), league = ''):
+    """
+    Checked copies of a script's stadium rows with latitude and longitude, as entered or
+    already parsed, so running it again is harmless
+    """
+    table, names = parse_table(rows)
+    check_table(table, names, parse_stripes(stripes), league)
+    return to_rows(table, names)
+
+
+def _source_path(league):
+    return os.path.join(root, leagues[league]['source'])
+
+
+def _saved_path(league, directory):
+    return os.path.join(directory, league + '.npz')
+
+
+def parse_league(league):
+    """Registry of a league parsed from its source, without the saved copy"""
+    rows, stripes = read_tables(league)
+    table, teams = parse_table(rows)
+    stripes = parse_stripes(stripes)
+    check_table(table, teams, stripes, league)
+    return Registry(league, table, teams, stripes, None)
+
+
+def load_registry(league, directory = registry_dir):
+    """
+    Registry of a league: its stadium table, team names and stripe rules
+    From memory while the source is unchanged, else from directory while the source
+    hash matches, else parsed and saved
+    """
+    if league not in leagues:
+        raise ValueError('Unknown league: {}'.format(league))
+    stat = os.stat(_source_path(league))
+    stamp = (stat.st_mtime_ns, stat.st_size, directory)
+    if league in _loaded and _loaded[league][0] == stamp:
+        return _loaded[league][1]
+
+    with open(_source_path(league), 'rb') as f:
+        source_hash = hashlib.sha256(f.read() + str(version).encode()).hexdigest()
+    registry = None
+    try:
+        with np.load(_saved_path(league, directory)) as saved:
+            if str(saved['source_hash']) == source_hash:
+                registry = Registry(
+                    league, saved['table'], saved['teams'].tolist(), saved['stripes'], source_hash
+                )
+    except (FileNotFoundError, ValueError, KeyError, EOFError):
+        pass # not saved yet, or from an older version
+
+    if registry is None:
+        registry = parse_league(league)._replace(source_hash = source_hash)
+        os.makedirs(directory, exist_ok = True)
+        temp = '{}.{}.tmp.npz'.format(_saved_path(league, directory)[: -4], os.getpid())
+        np.savez(
+            temp
+            , table = registry.table
+            , teams = np.array(registry.teams)
+            , stripes = registry.stripes
+            , source_hash = np.array(source_hash)
+        )
+        os.replace(temp, _saved_path(league, directory))
+
+    _loaded[league] = (stamp, registry)
+    return registry
+
+
+def load_league(league):
+    """
+    stadia_alltime and stripes for a league as new lists:
+    stadium rows are [coordinates, latitude, longitude, color, start, end, team, ...]
+    """
+    registry = load_registry(league)
+    return to_rows(registry.table, registry.teams), to_stripes(registry.stripes)
+
+
+def league_teams(league, stadia = None):
+    """Team name of each row of a league's stadia_alltime, from the registry or the rows given"""
+    if stadia is None:
+        registry = load_registry(league)
+        return [registry.teams[i] for i in registry.table['team']]
+    return [i[6] for i in stadia]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Parse and check stadium tables')
+    parser.add_argument('league', nargs = '*', help = 'by default all of them: {}'.format(', '.join(leagues)))
+    args = parser.parse_args()
+
+    for league in args.league or leagues:
+        registry = load_registry(league)
+        print('{}: {} rows, {} teams, {} stripe rules'.format(
+            league, len(registry.table), len(registry.teams), len(registry.stripes)
+        ))
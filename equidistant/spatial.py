@@ -0,0 +1,61 @@
+# Great circle nearest stadium using a KD-tree
+# Points and stadiums are moved onto a unit sphere as xyz. Straight line (chord) distance
+# through the sphere only grows as great circle distance grows, so the closest stadium by
+# chord is also the closest by haversine, and a KD-tree answers that in O(log M) per point
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from equidistant.assign import chunk_size
+from equidistant.distance import earth_radius, as_points
+
+
+def unit_xyz(coords):
+    """(N, 3) unit vectors from (N, 2) [latitude, longitude] in decimal"""
+    coords = np.asarray(coords, dtype = float).reshape(-1, 2)
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_miles(chord):
+    """Great circle distance in miles from chord length on the unit sphere"""
+    return earth_radius * 2 * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+class SphereIndex:
+    """
+    Index of one year's stadiums for great circle nearest neighbour queries
+    Build once per year, then query with every point
+    """
+
+    def __init__(self, stadiums):
+        stadiums = np.asarray(stadiums, dtype = float).reshape(-1, 2)
+        if len(stadiums) == 0:
+            raise ValueError('No stadiums to measure distance to')
+
+        # Teams sharing a stadium have the same coordinates. Keep the first one listed
+        # so ties resolve the same way as comparing every stadium in order
+        unique, first = np.unique(stadiums, axis = 0, return_index = True)
+        self.stadiums = stadiums
+        self.first = first
+        self.tree = cKDTree(unit_xyz(unique))
+
+    def query(self, points, return_distance = False):
+        """
+        Index of the closest stadium for every point, like assign.nearest_stadium
+        Distance, if asked for, is great circle miles
+        """
+        points = as_points(points).prepare(['xyz']) # unit vectors kept for the next year
+        closest = np.empty(len(points), dtype = np.intp)
+        min_dist = np.empty(len(points))
+        for start in range(0, len(points), chunk_size):
+            stop = start + chunk_size
+            chord, nearest = self.tree.query(points[start : stop].field('xyz'))
+            closest[start : stop] = self.first[nearest]
+            min_dist[start : stop] = chord_to_miles(chord)
+
+        if return_distance:
+            return closest, min_dist
+        return closest
@@ -0,0 +1,134 @@
+# Market size of every team's territory, year by year, without drawing anything
+# For each league, year and team: how many GeoNames places are closest to it, their
+# total population, and the land area of its territory
+# Areas come from a grid of cells holding at least one place, so oceans, lakes and
+# Canada don't count, weighted by cos(latitude) since degrees of longitude shrink northward
+# Shared stadiums and stripe rules split a territory the same way the maps do
+#
+#   python -m equidistant.stats NFL MLB -o market_size.csv
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from equidistant.distance import earth_radius
+from equidistant.geonames import load_points
+from equidistant.incremental import IncrementalAssigner
+from equidistant.leagues import leagues, year_range
+from equidistant.raster import BBox, team_palette, apply_stripes, row_index
+from equidistant.registry import league_teams, load_league
+from equidistant.stripes import split_shared
+from equidistant.timeline import epochs
+
+
+# Land grid cell size in degrees
+resolution = 0.1
+
+
+def land_cells(points, resolution = resolution, bbox = BBox):
+    """(K, 2) [latitude, longitude] centers and (K,) square miles of grid cells holding a place"""
+    points = np.asarray(points)
+    row = np.floor((points[:, 0] - bbox[2]) / resolution).astype(np.int64)
+    col = np.floor((points[:, 1] - bbox[0]) / resolution).astype(np.int64)
+    n_cols = int(np.ceil((bbox[1] - bbox[0]) / resolution)) + 1
+    keys = np.unique(row * n_cols + col)
+    row, col = keys // n_cols, keys % n_cols
+    centers = np.column_stack([
+        bbox[2] + (row + 0.5) * resolution
+        , bbox[0] + (col + 0.5) * resolution
+    ])
+    area = earth_radius**2 * np.radians(resolution)**2 * np.cos(np.radians(centers[:, 0]))
+    return centers, area
+
+
+def _team_values(assigner, epoch, index, lookup):
+    """Palette index per point with shared stadiums and stripe rules applied, like the maps"""
+    labels = split_shared(assigner.labels, assigner.points, assigner.stadia, epoch.rows)
+    return apply_stripes(index[labels], assigner.points, epoch.stripes, lookup)
+
+
+def league_stats(league, points = None, population = None, first_year = None, last_year = None
+                 , resolution = resolution):
+    """
+    Tidy DataFrame with a row per year and team active that year: league, year,
+    team, color, places, population, area in square miles and the team's share
+    of each. A team with more than one color that year gets a row per color
+    Points and population default to load_points(). Given points need a population
+    for each of them
+    """
+    stadia, stripes = load_league(league)
+    metric = leagues[league]['metric']
+    default_first, default_last = year_range(league, stadia)
+    first_year = default_first if first_year is None else first_year
+    last_year = default_last if last_year is None else last_year
+    if points is None:
+        points, population = load_points()
+    elif population is None:
+        raise ValueError('Points given without their population')
+    points = np.asarray(points, dtype = float)
+    population = np.asarray(population, dtype = float)
+    if population.shape != (len(points),):
+        raise ValueError('{} points but {} population values'.format(len(points), population.size))
+
+    palette, lookup, index, names = team_palette(stadia, league_teams(league))
+    centers, area = land_cells(points, resolution)
+
+    places = IncrementalAssigner(points, stadia, metric)
+    cells = IncrementalAssigner(centers, stadia, metric)
+
+    columns = {i : [] for i in ['year', 'team', 'color', 'places', 'population', 'area']}
+    for epoch in epochs(stadia, stripes, first_year, last_year):
+        if len(epoch.rows) == 0:
+            continue
+        places.update(epoch.rows)
+        cells.update(epoch.rows)
+        rules_lookup = row_index([stadia[i] for i in epoch.rows], lookup, index[epoch.rows])[1]
+        team = _team_values(places, epoch, index, rules_lookup)
+        cell_team = _team_values(cells, epoch, index, rules_lookup)
+
+        n_places = np.bincount(team, minlength = len(palette))
+        n_people = np.bincount(team, weights = population, minlength = len(palette))
+        n_area = np.bincount(cell_team, weights = area, minlength = len(palette))
+
+        # Teams with home games in listed order, then any that only stripe rules give places to
+        active = np.array(list(dict.fromkeys(np.concatenate([index[epoch.rows], np.union1d(team, cell_team)]))))
+        years = np.arange(epoch.start, epoch.end + 1)
+        columns['year'].append(np.repeat(years, len(active)))
+        columns['team'].append(np.tile(np.array(names, dtype = object)[active], len(years)))
+        columns['color'].append(np.tile(np.array(palette)[active], len(years)))
+        for name, counts in [('places', n_places), ('population', n_people), ('area', n_area)]:
+            columns[name].append(np.tile(counts[active], len(years)))
+
+    table = pd.DataFrame({name : np.concatenate(values) for name, values in columns.items()})
+    table.insert(0, 'league', league)
+    table['population'] = table['population'].astype(np.int64)
+    for name in ['places', 'population', 'area']:
+        table[name + '_share'] = table[name] / table.groupby('year')[name].transform('sum')
+    return table
+
+
+def write_table(table, path):
+    """Write stats as Parquet for a path ending in .parquet (needs pyarrow), else CSV"""
+    if path.endswith('.parquet'):
+        table.to_parquet(path, index = False)
+    else:
+        table.to_csv(path, index = False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Places, population and area per team per year')
+    parser.add_argument('league', nargs = '+', choices = list(leagues))
+    parser.add_argument('-o', '--output', default = 'market_size.csv', help = '.csv or .parquet')
+    parser.add_argument('--first-year', type = int)
+    parser.add_argument('--last-year', type = int)
+    args = parser.parse_args()
+
+    points, population = load_points()
+    write_table(
+        pd.concat([
+            league_stats(i, points, population, args.first_year, args.last_year)
+            for i in args.league
+        ], ignore_index = True)
+        , args.output
+    )
@@ -0,0 +1,61 @@
+# Teams sharing a stadium split its territory into diagonal stripes
+# Stadiums are shared when coordinates match after rounding to 5 places, about 50 feet,
+# so the same stadium entered twice still counts. Teams are told apart by the name in
+# their rows, or by color in rows without one. Of k teams sharing one, the band
+# floor(latitude + longitude) mod k goes to the band-th team listed
+# Stripe rules in the scripts are only needed for teams sharing a territory without
+# sharing a stadium, like wartime mergers
+
+import numpy as np
+
+
+precision = 5
+
+
+def team_of(row):
+    """Team of a stadium row: its name from the registry, or its color if it has none"""
+    return row[6] if len(row) > 6 else row[3]
+
+
+def co_tenants(stadia, active = None, precision = precision):
+    """
+    Teams in the same stadium as each row, among the active rows (default all)
+    Returns a (len(stadia), k) array of rows, the first listed row of each team at
+    that stadium in listed order and padded with the first, and the (len(stadia),) count
+    Inactive rows only share with themselves
+    """
+    n = len(stadia)
+    active = range(n) if active is None else active
+    keys = {int(row) : (round(stadia[row][1], precision), round(stadia[row][2], precision)) for row in active}
+    stadiums = {} # rounded coordinates: {team: first row}
+    for row, key in keys.items():
+        stadiums.setdefault(key, {}).setdefault(team_of(stadia[row]), row)
+
+    width = max([len(i) for i in stadiums.values()] + [1])
+    table = np.repeat(np.arange(n)[:, np.newaxis], width, axis = 1)
+    count = np.ones(n, dtype = np.intp)
+    for row, key in keys.items():
+        members = list(stadiums[key].values())
+        if len(members) > 1:
+            table[row] = members + members[:1] * (width - len(members))
+            count[row] = len(members)
+    return table, count
+
+
+def split_shared(closest, points, stadia, active = None, precision = precision):
+    """
+    Closest row per point with shared stadiums striped between their teams
+    closest indexes stadia, as from nearest_stadium or IncrementalAssigner.labels,
+    and points are the (N, 2) [latitude, longitude] they belong to
+    """
+    table, count = co_tenants(stadia, active, precision)
+    return pick_tenant(closest, points, table, count)
+
+
+def pick_tenant(closest, points, table, count):
+    """split_shared with co_tenants' table and count already worked out"""
+    if (count == 1).all():
+        return closest
+    points = np.asarray(points)
+    band = np.floor(points[:, 0].astype(float) + points[:, 1]).astype(np.intp) % count[closest]
+    return table[closest, band]
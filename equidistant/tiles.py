@@ -0,0 +1,229 @@
+# Slippy map tiles of a league's closest teams, a set for every year
+# XYZ web mercator tiles, 256 pixels square, in <folder>/<year>/<z>/<x>/<y>.png like
+# OpenStreetMap's, so a web map can show them over a base map at any zoom
+# Every pixel gets its closest team, not just the places in GeoNames, so the tiles
+# stay sharp up close and reach past the US BBox, into Canada for example
+# Each worker takes a share of the tiles through every year. A tile is only drawn
+# again when a stadium change can reach it. Otherwise the year before's file is linked
+#
+#   python -m equidistant.tiles NHL --region "US and Canada" --zoom 3 8 -o "NHL tiles"
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+
+from equidistant.assign import nearest_stadium, stadium_coords
+from equidistant.distance import PointSet, distance
+from equidistant.leagues import leagues, year_range
+from equidistant.raster import BBox, background, team_palette, apply_stripes, row_index, to_image
+from equidistant.registry import league_teams, load_league
+from equidistant.stripes import split_shared
+from equidistant.timeline import epochs
+
+
+# (west, east, south, north) of each region, like BBox
+regions = {
+    'US' : BBox
+    , 'US and Canada' : (-139.1, -52.6, 24.4, 60.)
+}
+
+tile_size = 256
+
+# Shares of the tiles per worker, so workers with quick tiles pick up more
+shares_per_worker = 4
+
+
+def tile_bounds(z, x, y):
+    """(west, east, south, north) of a tile"""
+    n = 2**z
+    lat = lambda row: math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return x / n * 360 - 180, (x + 1) / n * 360 - 180, lat(y + 1), lat(y)
+
+
+def region_tiles(bbox, zoom):
+    """(z, x, y) of every tile at a zoom that overlaps bbox"""
+    n = 2**zoom
+    column = lambda lon: min(int((lon + 180) / 360 * n), n - 1)
+    row = lambda lat: min(int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n), n - 1)
+    return [
+        (zoom, x, y)
+        for x in range(column(bbox[0]), column(bbox[1]) + 1)
+        for y in range(row(bbox[3]), row(bbox[2]) + 1)
+    ]
+
+
+def tile_centers(z, x, y):
+    """(256 * 256, 2) [latitude, longitude] of a tile's pixel centers, top row first"""
+    n = 2**z
+    offsets = (np.arange(tile_size) + 0.5) / tile_size
+    lon = (x + offsets) / n * 360 - 180
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    lat, lon = np.meshgrid(lat, lon, indexing = 'ij')
+    return np.column_stack([lat.ravel(), lon.ravel()])
+
+
+def _place(source, target):
+    """Hard link target to an already drawn tile, or copy it where links aren't allowed"""
+    os.makedirs(os.path.dirname(target), exist_ok = True)
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _may_change(tile, pixels, keys, rules, metric):
+    """
+    False when a tile drawn for the last epoch is still right for these stadium keys
+    Only a stadium that is new since then can take pixels from their owners, and only
+    if it is as close to one of them as the farthest owner is
+    """
+    owned = [i for i in keys if i[: 2] in tile['locations']]
+    if owned != tile['owned'] or rules != tile['rules']:
+        return True
+    for i in set(keys) - tile['keys']:
+        if distance(pixels, [i[: 2]], metric).min() <= tile['reach']:
+            return True
+    return False
+
+
+def _draw(pixels, inside, rows, epoch, lookup, metric, index = None):
+    """Palette indices of a tile's pixels, the distance to each one's closest stadium, and its owners"""
+    closest, dist = nearest_stadium(pixels, stadium_coords(rows), metric = metric, return_distance = True)
+    owners = np.unique(closest[inside])
+    closest = split_shared(closest, pixels, rows)
+    colors, lookup = row_index(rows, lookup, index)
+    values = apply_stripes(colors[closest], np.asarray(pixels), epoch.stripes, lookup)
+    values[~inside] = background
+    return values, dist[inside].max(), owners
+
+
+def render_tiles(tiles, stadia, timeline, lookup, palette, directory, metric = 'pythagorean'
+                 , bbox = BBox, alpha = 0.6, index = None):
+    """
+    Draw tiles through every year in timeline, as <directory>/<year>/<z>/<x>/<y>.png
+    index is the palette index of every stadium row, None to color rows by lookup
+    Returns {year: [tiles drawn, tiles linked]}
+    """
+    counts = {yr : [0, 0] for epoch in timeline for yr in range(epoch.start, epoch.end + 1)}
+    for z, x, y in tiles:
+        pixels = PointSet(tile_centers(z, x, y)) # trig is kept for every year of the tile
+        lat, lon = pixels.coords[:, 0], pixels.coords[:, 1]
+        inside = (lon >= bbox[0]) & (lon <= bbox[1]) & (lat >= bbox[2]) & (lat <= bbox[3])
+        if not inside.any():
+            continue
+        tile = None
+        for epoch in timeline:
+            rows = [stadia[i] for i in epoch.rows]
+            if len(rows) == 0:
+                tile = None # no file these years
+                continue
+            keys = [(i[1], i[2], i[3]) if index is None else (i[1], i[2], int(index[n]))
+                    for n, i in zip(epoch.rows, rows)]
+            rules = [(i[2], i[3]) for i in epoch.stripes]
+            name = os.path.join(str(z), str(x), str(y) + '.png')
+
+            if tile is not None and not _may_change(tile, pixels, keys, rules, metric):
+                first = epoch.start
+            else:
+                values, reach, owners = _draw(pixels, inside, rows, epoch, lookup, metric
+                                              , None if index is None else index[epoch.rows])
+                locations = {keys[i][: 2] for i in owners}
+                path = os.path.join(directory, str(epoch.start), name)
+                os.makedirs(os.path.dirname(path), exist_ok = True)
+                if os.path.exists(path):
+                    os.remove(path) # may be linked from other years
+                to_image(values.reshape(tile_size, tile_size), palette, alpha).save(path, optimize = True)
+                counts[epoch.start][0] += 1
+                first = epoch.start + 1
+                tile = {
+                    'path' : path
+                    , 'locations' : locations
+                    , 'owned' : [i for i in keys if i[: 2] in locations]
+                    , 'keys' : set(keys)
+                    , 'rules' : rules
+                    , 'reach' : reach
+                }
+            tile['keys'] = set(keys)
+            for yr in range(first, epoch.end + 1):
+                _place(tile['path'], os.path.join(directory, str(yr), name))
+                counts[yr][1] += 1
+    return counts
+
+
+def league_tiles(league, directory, region = 'US', zoom = (3, 7), first_year = None, last_year = None
+                 , workers = None, alpha = 0.6):
+    """
+    Tiles of a league for every year from first_year to last_year, drawn across processes
+    region is a key of regions or a (west, east, south, north) box, zoom the
+    lowest and highest zoom levels. Writes manifest.json next to the year folders
+    workers is the number of processes, None for one per core
+    """
+    stadia, stripes = load_league(league)
+    metric = leagues[league]['metric']
+    default_first, default_last = year_range(league, stadia)
+    first_year = default_first if first_year is None else first_year
+    last_year = default_last if last_year is None else last_year
+    bbox = regions[region] if isinstance(region, str) else tuple(region)
+    palette, lookup, index, teams = team_palette(stadia, league_teams(league))
+    timeline = epochs(stadia, stripes, first_year, last_year)
+    tiles = [i for z in range(zoom[0], zoom[1] + 1) for i in region_tiles(bbox, z)]
+
+    workers = workers or os.cpu_count()
+    n_shares = min(workers * shares_per_worker, len(tiles))
+    counts = {yr : [0, 0] for yr in range(first_year, last_year + 1)}
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        futures = [
+            pool.submit(render_tiles, tiles[i :: n_shares], stadia, timeline, lookup, palette
+                        , directory, metric, bbox, alpha, index)
+            for i in range(n_shares)
+        ]
+        for future in futures:
+            for yr, (drawn, linked) in future.result().items():
+                counts[yr][0] += drawn
+                counts[yr][1] += linked
+
+    manifest = {
+        'league' : league
+        , 'template' : '{year}/{z}/{x}/{y}.png'
+        , 'bbox' : list(bbox)
+        , 'zoom' : list(zoom)
+        , 'first_year' : first_year
+        , 'last_year' : last_year
+        , 'metric' : metric
+        , 'palette' : palette
+        , 'teams' : teams
+        , 'years' : {str(yr) : {'drawn' : i[0], 'linked' : i[1]} for yr, i in counts.items()}
+    }
+    os.makedirs(directory, exist_ok = True)
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent = 1)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Web map tiles of the closest team, by year')
+    parser.add_argument('league', choices = list(leagues))
+    parser.add_argument('-o', '--output', help = 'folder, by default "<league> tiles"')
+    parser.add_argument('--region', default = 'US', choices = list(regions))
+    parser.add_argument('--zoom', type = int, nargs = 2, default = [3, 7], metavar = ('MIN', 'MAX'))
+    parser.add_argument('--first-year', type = int)
+    parser.add_argument('--last-year', type = int)
+    parser.add_argument('--workers', type = int, help = 'processes, by default one per core')
+    args = parser.parse_args()
+
+    league_tiles(
+        args.league
+        , args.output or args.league + ' tiles'
+        , args.region
+        , args.zoom
+        , args.first_year
+        , args.last_year
+        , args.workers
+    )
@@ -0,0 +1,54 @@
+# Split a league's history into epochs
+# An epoch is a run of consecutive years where the same stadiums are active, in the
+# same order, with the same stripe rules. Every year in an epoch gets the same map,
+# so the closest team only needs to be found once per epoch
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# start and end are inclusive years, rows index into stadia_alltime,
+# stripes are the stripe rules in effect
+Epoch = namedtuple('Epoch', ['start', 'end', 'rows', 'stripes'])
+
+
+def active_rows(stadia, yr):
+    """Indices of the stadium rows with home games in a year, in listed order"""
+    return [n for n, i in enumerate(stadia) if i[4] <= yr and i[5] >= yr]
+
+
+def active_stripes(stripes, yr):
+    """Stripe rules in effect in a year"""
+    return [i for i in stripes if i[0] <= yr and i[1] >= yr]
+
+
+def year_epoch(stadia, stripes, yr):
+    """Epoch of just one year, for mapping a year at a time"""
+    return Epoch(yr, yr, np.array(active_rows(stadia, yr), dtype = np.intp), active_stripes(stripes, yr))
+
+
+def epochs(stadia, stripes, first_year, last_year):
+    """
+    List of Epochs covering first_year through last_year
+    Rows are compared on coordinates and color, not position in the list, so a team
+    listed again with the same stadium does not start a new epoch
+    """
+    starts = np.array([i[4] for i in stadia], dtype = float)
+    ends = np.array([i[5] for i in stadia], dtype = float)
+
+    timeline = []
+    last_key = None
+    for yr in range(first_year, last_year + 1):
+        rows = np.flatnonzero((starts <= yr) & (ends >= yr))
+        rules = active_stripes(stripes, yr)
+        key = (
+            tuple((stadia[n][1], stadia[n][2], stadia[n][3]) for n in rows)
+            , tuple((i[2], i[3]) for i in rules)
+        )
+        if key == last_key:
+            timeline[-1] = timeline[-1]._replace(end = yr)
+        else:
+            timeline.append(Epoch(yr, yr, rows, rules))
+            last_key = key
+    return timeline
@@ -0,0 +1,309 @@
+# Exact territories as polygons instead of dots
+# A team's territory is everywhere closer to its stadium than to any other, so it can be
+# built by cutting the map area down with one line per other stadium:
+#   haversine: the great circle halfway between two stadiums, which gives the spherical
+#       Voronoi diagram, done on unit vectors so each cut is exact
+#   pythagorean: the straight line halfway between them on the flat lat/lon map
+# A year is a few dozen polygons, at any resolution. Shared stadiums and stripe rules
+# become patterned fills in SVG
+#
+#   python -m equidistant.voronoi NFL 2021 territories.svg
+
+import argparse
+import json
+
+import numpy as np
+
+from equidistant.assign import stadium_coords
+from equidistant.raster import BBox, size
+from equidistant.spatial import unit_xyz
+from equidistant.stripes import co_tenants, precision, team_of
+from equidistant.timeline import active_rows, active_stripes
+
+
+# Longest edge in degrees, for the map edges and for curved borders in the output
+step = 0.25
+
+
+def bbox_ring(bbox = BBox):
+    """(K, 2) [longitude, latitude] around the BBox counterclockwise, a vertex every step"""
+    def edge(a, b):
+        n = max(int(np.ceil(np.hypot(b[0] - a[0], b[1] - a[1]) / step)), 1)
+        t = np.arange(n)[:, np.newaxis] / n
+        return np.asarray(a) + t * (np.asarray(b) - np.asarray(a))
+
+    corners = [(bbox[0], bbox[2]), (bbox[1], bbox[2]), (bbox[1], bbox[3]), (bbox[0], bbox[3])]
+    return np.concatenate([edge(corners[k], corners[(k + 1) % 4]) for k in range(4)])
+
+
+def clip(ring, f, cut):
+    """
+    Part of a ring of vertices where f >= 0, keeping the order
+    f is the (K,) side of every vertex, cut(a, b, fa, fb) the vertex where an edge crosses
+    """
+    inside = f >= 0
+    if inside.all():
+        return ring
+    if not inside.any():
+        return ring[:0]
+    out = []
+    for k in range(len(ring)):
+        j = (k + 1) % len(ring)
+        if inside[k]:
+            out.append(ring[k])
+        if inside[k] != inside[j]:
+            out.append(cut(ring[k], ring[j], f[k], f[j]))
+    return np.array(out)
+
+
+def _cut_plane(a, b, fa, fb):
+    return a + fa / (fa - fb) * (b - a)
+
+
+def _cut_sphere(a, b, fa, fb):
+    p = a + fa / (fa - fb) * (b - a)
+    return p / np.linalg.norm(p)
+
+
+def to_lonlat(xyz):
+    """(K, 2) [longitude, latitude] from unit vectors"""
+    return np.column_stack([
+        np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0]))
+        , np.degrees(np.arcsin(np.clip(xyz[:, 2], -1, 1)))
+    ])
+
+
+def densify(ring):
+    """Ring of unit vectors with points added along great circles so no edge is over step"""
+    out = []
+    for k in range(len(ring)):
+        a, b = ring[k], ring[(k + 1) % len(ring)]
+        angle = np.arccos(np.clip(a @ b, -1, 1))
+        n = max(int(np.ceil(np.degrees(angle) / step)), 1)
+        out.append(a)
+        for t in np.arange(1, n) / n:
+            # slerp
+            out.append((np.sin((1 - t) * angle) * a + np.sin(t * angle) * b) / np.sin(angle))
+    return np.array(out)
+
+
+def cells(stadiums, metric = 'pythagorean', bbox = BBox):
+    """
+    Territory of each of (M, 2) [latitude, longitude] stadiums inside the BBox
+    as a list of (K, 2) [longitude, latitude] rings, empty where a stadium has no territory
+    Stadiums at the same coordinates as one listed earlier get nothing, like the dot maps
+    """
+    stadiums = np.asarray(stadiums, dtype = float).reshape(-1, 2)
+    _, first = np.unique(stadiums.round(precision), axis = 0, return_index = True)
+    first = np.sort(first)
+    ring = bbox_ring(bbox)
+
+    if metric == 'haversine':
+        start = unit_xyz(ring[:, ::-1])
+        points = unit_xyz(stadiums)
+    elif metric == 'pythagorean':
+        start = ring
+        points = stadiums[:, ::-1] # [longitude, latitude] like the ring
+    else:
+        raise ValueError('Unknown distance metric: {}'.format(metric))
+
+    out = [np.empty((0, 2)) for _ in range(len(stadiums))]
+    for i in first:
+        poly = start
+        # Closest neighbours first, so the polygon shrinks early and later cuts are cheap
+        others = sorted((j for j in first if j != i), key = lambda j: np.sum((points[j] - points[i])**2))
+        for j in others:
+            normal = points[i] - points[j]
+            if metric == 'haversine':
+                # Closer to i by great circle is the same as a larger dot product with i
+                poly = clip(poly, poly @ normal, _cut_sphere)
+            else:
+                poly = clip(poly, (poly - (points[i] + points[j]) / 2) @ normal, _cut_plane)
+            if len(poly) == 0:
+                break
+        if len(poly) and metric == 'haversine':
+            poly = to_lonlat(densify(poly))
+        out[i] = poly
+    return out
+
+
+def territories(stadia, stripes = [], metric = 'pythagorean', bbox = BBox):
+    """
+    One dict per stadium with territory in the BBox, for parsed stadium rows:
+    teams (the teams sharing the stadium, in stripe order), colors (theirs), color
+    (the first of them), stripes ([from color, to color] rules that apply),
+    coordinates of the stadium as entered, and ring, the (K, 2) [longitude, latitude] border
+    """
+    rings = cells(stadium_coords(stadia), metric, bbox)
+    table, count = co_tenants(stadia)
+    out = []
+    for n, ring in enumerate(rings):
+        if len(ring) < 3:
+            continue
+        row = stadia[n]
+        members = table[n, : count[n]]
+        colors = [stadia[j][3] for j in members]
+        out.append({
+            'teams' : [team_of(stadia[j]) for j in members]
+            , 'colors' : colors
+            , 'color' : colors[0]
+            , 'stripes' : [[i[2], i[3]] for i in stripes if i[2] in colors]
+            , 'coordinates' : row[0]
+            , 'latitude' : row[1]
+            , 'longitude' : row[2]
+            , 'ring' : ring
+        })
+    return out
+
+
+def year_territories(stadia, stripes, yr, metric = 'pythagorean', bbox = BBox):
+    """territories() for the stadiums and stripe rules of one year"""
+    return territories(
+        [stadia[i] for i in active_rows(stadia, yr)]
+        , active_stripes(stripes, yr)
+        , metric
+        , bbox
+    )
+
+
+def to_geojson(areas, path = None):
+    """GeoJSON FeatureCollection of territories, also written to path if given"""
+    collection = {
+        'type' : 'FeatureCollection'
+        , 'features' : [
+            {
+                'type' : 'Feature'
+                , 'properties' : {
+                    'color' : i['color']
+                    , 'teams' : i['teams']
+                    , 'colors' : i['colors']
+                    , 'stripes' : i['stripes']
+                    , 'stadium' : i['coordinates']
+                }
+                , 'geometry' : {
+                    'type' : 'Polygon'
+                    , 'coordinates' : [np.vstack([i['ring'], i['ring'][:1]]).round(6).tolist()]
+                }
+            }
+            for i in areas
+        ]
+    }
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump(collection, f)
+    return collection
+
+
+def pattern(colors, rules):
+    """
+    Colored polygons tiling a square of lon/lat for a territory's fill, and its side
+    Bands of floor(lat + lon) go to the teams' colors in turn, as in stripes.split_shared, then
+    rules recolor swathes where lat + lon rounds to an even number, as in raster.stripe_mask
+    """
+    side = 2 * len(colors) # repeats both every len(colors) and every 2 in lat + lon
+    square = np.array([[0., 0.], [side, 0.], [side, side], [0., side]])
+
+    # Half degree steps of lat + lon across the square, joined where the color doesn't change
+    pieces = []
+    for h in range(4 * side):
+        color = colors[(h // 2) % len(colors)]
+        if (h + 1) // 2 % 2 == 0:
+            for i in rules:
+                if color == i[0]:
+                    color = i[1]
+        if pieces and pieces[-1][2] == color:
+            pieces[-1][1] = (h + 1) / 2
+        else:
+            pieces.append([h / 2, (h + 1) / 2, color])
+
+    out = []
+    for low, high, color in pieces:
+        piece = clip(square, square.sum(axis = 1) - low, _cut_plane)
+        piece = clip(piece, high - piece.sum(axis = 1), _cut_plane) if len(piece) else piece
+        if len(piece) >= 3:
+            out.append((piece, color))
+    return out, side
+
+
+def to_svg(areas, path = None, bbox = BBox, size = size, title = None):
+    """
+    SVG of territories on the same flat lat/lon frame as the dot maps
+    Shared stadiums and stripe rules are filled with the same stripes as the dot maps
+    """
+    width, height = size
+    scale_x = width / (bbox[1] - bbox[0])
+    scale_y = height / (bbox[3] - bbox[2])
+
+    defs = []
+    shapes = []
+    for n, i in enumerate(areas):
+        fill = i['color']
+        if len(i['colors']) > 1 or i['stripes']:
+            # Pattern tiles are in lon/lat, so bands line up with the dot maps
+            pieces, side = pattern(i['colors'], i['stripes'])
+            bands = ''.join(
+                '<polygon points="{}" fill="{}"/>'.format(
+                    ' '.join('{:g},{:g}'.format(x, y) for x, y in piece)
+                    , color
+                )
+                for piece, color in pieces
+            )
+            defs.append(
+                '<pattern id="stripes{}" patternUnits="userSpaceOnUse" width="{}" height="{}">{}</pattern>'
+                .format(n, side, side, bands)
+            )
+            fill = 'url(#stripes{})'.format(n)
+        points = ' '.join('{:.5f},{:.5f}'.format(lon, lat) for lon, lat in i['ring'])
+        shapes.append('<polygon points="{}" fill="{}"/>'.format(points, fill))
+
+    dots = ''.join(
+        '<circle cx="{:.1f}" cy="{:.1f}" r="4" fill="#000000"/>'.format(
+            (i['longitude'] - bbox[0]) * scale_x
+            , (bbox[3] - i['latitude']) * scale_y
+        )
+        for i in areas
+    )
+    text = '' if title is None else (
+        '<text x="{}" y="{}" font-size="{}" text-anchor="middle" font-family="sans-serif">{}</text>'
+        .format(width / 2, height / 25, height / 40, title)
+    )
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}">'
+        '<defs>{defs}</defs>'
+        # Lon/lat inside the group, north up
+        '<g transform="scale({sx:.6f},{sy:.6f}) translate({tx:.7f},{ty:.7f})">{shapes}</g>'
+        '{dots}{text}</svg>'
+    ).format(
+        w = width
+        , h = height
+        , defs = ''.join(defs)
+        , sx = scale_x
+        , sy = -scale_y
+        , tx = -bbox[0]
+        , ty = -bbox[3]
+        , shapes = ''.join(shapes)
+        , dots = dots
+        , text = text
+    )
+    if path is not None:
+        with open(path, 'w') as f:
+            f.write(svg)
+    return svg
+
+
+if __name__ == '__main__':
+    from equidistant.leagues import leagues
+    from equidistant.registry import load_league
+
+    parser = argparse.ArgumentParser(description = 'Territory polygons for a league and year')
+    parser.add_argument('league', choices = list(leagues))
+    parser.add_argument('year', type = int)
+    parser.add_argument('path', help = 'ending in .svg or .geojson')
+    args = parser.parse_args()
+
+    stadia, stripes = load_league(args.league)
+    areas = year_territories(stadia, stripes, args.year, leagues[args.league]['metric'])
+    if args.path.endswith('.svg'):
+        to_svg(areas, args.path, title = 'Closest {} team {}'.format(args.league, args.year))
+    else:
+        to_geojson(areas, args.path)